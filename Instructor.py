@@ -2,8 +2,23 @@ import json
 import re
 from typing import Any, cast
 
+# шаблоны компилируются один раз, а не при каждой проверке
+_NAME_RE = re.compile(r"[A-Za-zА-Яа-яЁё\-'\s]+")
+_PHONE_RE = re.compile(r"[0-9+\-\s()]+")
+_NON_DIGIT_RE = re.compile(r"\D")
+
 
 class Instructor:
+    # без __dict__: на 10^5–10^6 объектов заметно меньше памяти
+    __slots__ = (
+        "__instructor_id",
+        "__last_name",
+        "__first_name",
+        "__patronymic",
+        "__phone",
+        "__experience_years",
+    )
+
     def __init__(
         self,
         instructor_id: int | str | dict,
@@ -66,7 +81,7 @@ class Instructor:
         v = value.strip()
         if v == "":
             raise ValueError(f"{field} не может быть пустым")
-        if not re.fullmatch(r"[A-Za-zА-Яа-яЁё\-'\s]+", v):
+        if not _NAME_RE.fullmatch(v):
             raise ValueError(f"{field} должен содержать только буквы, пробелы, апостроф или дефис")
         return v
 
@@ -81,7 +96,7 @@ class Instructor:
             raise ValueError(
                 "patronymic не может быть пустой строкой; используйте None, если отчества нет"
             )
-        if not re.fullmatch(r"[A-Za-zА-Яа-яЁё\-'\s]+", v):
+        if not _NAME_RE.fullmatch(v):
             raise ValueError(
                 "patronymic должен содержать только буквы, пробелы, апостроф или дефис"
             )
@@ -92,13 +107,13 @@ class Instructor:
         if not isinstance(value, str):
             raise ValueError("phone должен быть строкой")
         v = value.strip()
-        if not re.fullmatch(r"[0-9+\-\s()]+", v):
+        if not _PHONE_RE.fullmatch(v):
             raise ValueError(
                 "phone содержит недопустимые символы (разрешены цифры, пробелы, + - ( ))"
             )
         if v.count("+") > 1 or ("+" in v and not v.startswith("+")):
             raise ValueError("phone содержит недопустимый символ '+'")
-        digits = re.sub(r"\D", "", v)
+        digits = _NON_DIGIT_RE.sub("", v)
         if not (7 <= len(digits) <= 15):
             raise ValueError(
                 "phone должен соответствовать формату международного номера (E.164: 7–15 цифр)"
@@ -190,6 +205,19 @@ class Instructor:
             experience_years=pick("experience_years", "exp"),
         )
 
+    # доверенный путь для строк, которые уже проверены при записи (наша БД, наши файлы):
+    # сеттеры и валидаторы не вызываются
+    @classmethod
+    def from_validated_row(cls, row: dict) -> "Instructor":
+        obj = cls.__new__(cls)
+        obj.__instructor_id = row["instructor_id"]
+        obj.__last_name = row["last_name"]
+        obj.__first_name = row["first_name"]
+        obj.__patronymic = row.get("patronymic")
+        obj.__phone = row["phone"]
+        obj.__experience_years = row["experience_years"]
+        return obj
+
     def __str__(self) -> str:
         return (
             f"Instructor(id={self.instructor_id}, "
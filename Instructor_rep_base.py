@@ -1,17 +1,42 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Iterable, Iterator
+from itertools import islice
 import os
+import sys
 from typing import cast
 
+from filter_spec import Condition
 from Instructor import Instructor
+from instructor_repo_iface import BatchItemResult, BatchResult
 from PublicInstructorProfile import PublicInstructorProfile
+from trigram_index import TrigramIndex
 
 
 class InstructorRepBase(ABC):
-    def __init__(self, path: str):
+    def __init__(self, path: str, cached: bool = False):
         self.path = path
         os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # кэшированный режим: строки и объекты держим в памяти,
+        # файл перечитываем только если изменились mtime/size/inode
+        self.cached = cached
+        self._rows_cache: list[dict] | None = None
+        self._items_cache: list[Instructor] | None = None
+        self._stamp: tuple[int, int, int] | None = None
+        # индекс первичного ключа: instructor_id -> позиция строки, и текущий max id
+        self._pos: dict[int, int] | None = None
+        self._max_id = 0
+        # ключ равенства (ФИО + стаж) -> сколько строк с таким ключом
+        self._keys: dict[tuple, int] | None = None
+        # вторичные индексы: отсортированные пары (стаж, id) и (фамилия casefold, id)
+        self._by_exp: list[tuple[int, int]] | None = None
+        self._by_last: list[tuple[str, int]] | None = None
+        # триграммы фамилий для search()
+        self._trgm: TrigramIndex | None = None
+        # счётчик записей через репозиторий (для state_token)
+        self._writes = 0
 
     ## методы будут реализованы в наследниках
     # сами пути к файлам скрыты в методах репозиториев и не подаются снаружи
@@ -21,6 +46,265 @@ class InstructorRepBase(ABC):
     @abstractmethod
     def _save_raw(self, data: list[dict]) -> None: ...
 
+    # потоковое чтение строк; наследники могут не разбирать файл целиком
+    def _iter_raw(self) -> Iterator[dict]:
+        return iter(self._load_raw())
+
+    # точечные изменения; по умолчанию файл просто переписывается целиком
+    def _save_changes(self, data: list[dict], put: list[dict], deleted: list[int]) -> None:
+        self._save_raw(data)
+
+    # отпечаток файла для проверки актуальности кэша
+    def _file_stamp(self) -> tuple[int, int, int] | None:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    # отпечаток состояния для внешних кэшей (декораторов): меняется при любой записи через
+    # репозиторий и при изменении файла снаружи
+    def state_token(self) -> tuple:
+        return (self._writes, self._file_stamp())
+
+    def _is_fresh(self) -> bool:
+        return self.cached and self._rows_cache is not None and self._stamp == self._file_stamp()
+
+    # сбросить кэш, следующее обращение перечитает файл
+    def invalidate(self) -> None:
+        self._rows_cache = None
+        self._items_cache = None
+        self._stamp = None
+        self._reset_indexes()
+
+    def _reset_indexes(self) -> None:
+        self._pos = None
+        self._max_id = 0
+        self._keys = None
+        self._drop_secondary()
+
+    def _drop_secondary(self) -> None:
+        self._by_exp = None
+        self._by_last = None
+        self._trgm = None
+
+    # строки из файла (или из кэша, если файл не менялся)
+    def _rows(self) -> list[dict]:
+        if self._is_fresh():
+            return cast(list[dict], self._rows_cache)
+        stamp = self._file_stamp()
+        rows = self._load_raw()
+        self._items_cache = None
+        self._reset_indexes()
+        if self.cached:
+            self._rows_cache = rows
+            self._stamp = stamp
+        return rows
+
+    # записываем уже изменённые строки и обновляем кэш на месте
+    def _persist(
+        self, rows: list[dict], put: list[dict] | None = None, deleted: list[int] | None = None
+    ) -> None:
+        self._writes += 1
+        try:
+            if put or deleted:
+                self._save_changes(rows, put or [], deleted or [])
+            else:
+                self._save_raw(rows)
+        except Exception:
+            self.invalidate()
+            raise
+        if self.cached:
+            self._rows_cache = rows
+            self._stamp = self._file_stamp()
+
+    @staticmethod
+    def _row_id(r: dict) -> int | None:
+        iid = cast(int | str | None, r.get("instructor_id"))
+        return None if iid is None else int(iid)
+
+    # индекс строится лениво по текущим строкам и дальше поддерживается на месте
+    def _index(self, rows: list[dict]) -> dict[int, int]:
+        if self._pos is None:
+            pos: dict[int, int] = {}
+            for idx, r in enumerate(rows):
+                iid = self._row_id(r)
+                if iid is not None:
+                    pos.setdefault(iid, idx)
+            self._pos = pos
+            self._max_id = max(pos, default=0)
+        return self._pos
+
+    # тот же ключ, по которому сравнивает Instructor.__eq__
+    @staticmethod
+    def _eq_key(ins: Instructor) -> tuple:
+        return (ins.last_name, ins.first_name, ins.patronymic, ins.experience_years)
+
+    @staticmethod
+    def _row_key(r: dict) -> tuple:
+        def norm(v: object) -> object:
+            return v.strip() if isinstance(v, str) else v
+
+        return (
+            norm(r.get("last_name")),
+            norm(r.get("first_name")),
+            norm(r.get("patronymic")),
+            r.get("experience_years") or r.get("exp"),
+        )
+
+    def _key_index(self, rows: list[dict]) -> dict[tuple, int]:
+        if self._keys is None:
+            keys: dict[tuple, int] = {}
+            for r in rows:
+                key = self._row_key(r)
+                keys[key] = keys.get(key, 0) + 1
+            self._keys = keys
+        return self._keys
+
+    @staticmethod
+    def _key_discard(keys: dict[tuple, int], key: tuple) -> None:
+        left = keys.get(key, 0) - 1
+        if left > 0:
+            keys[key] = left
+        else:
+            keys.pop(key, None)
+
+    # ключи строки во вторичных индексах; строки не по формату в индекс не попадают -
+    # такие всё равно не пройдут проверку Instructor
+    @staticmethod
+    def _exp_entry(r: dict) -> tuple[int, int] | None:
+        iid = r.get("instructor_id")
+        exp = r.get("experience_years") or r.get("exp")
+        if not isinstance(iid, int) or not isinstance(exp, int):
+            return None
+        return (exp, iid)
+
+    @staticmethod
+    def _last_entry(r: dict) -> tuple[str, int] | None:
+        iid = r.get("instructor_id")
+        last = r.get("last_name")
+        if not isinstance(iid, int) or not isinstance(last, str):
+            return None
+        return (last.strip().casefold(), iid)
+
+    def _exp_index(self, rows: list[dict]) -> list[tuple[int, int]]:
+        if self._by_exp is None:
+            self._by_exp = sorted(e for e in map(self._exp_entry, rows) if e is not None)
+        return self._by_exp
+
+    def _last_index(self, rows: list[dict]) -> list[tuple[str, int]]:
+        if self._by_last is None:
+            self._by_last = sorted(e for e in map(self._last_entry, rows) if e is not None)
+        return self._by_last
+
+    # точечное обновление уже построенных индексов при записи одной строки
+    def _secondary_put(self, row: dict) -> None:
+        e = self._exp_entry(row)
+        if self._by_exp is not None and e is not None:
+            insort(self._by_exp, e)
+        e2 = self._last_entry(row)
+        if self._by_last is not None and e2 is not None:
+            insort(self._by_last, e2)
+        if self._trgm is not None and e2 is not None:
+            self._trgm.add(e2[1], row["last_name"])
+
+    def _secondary_drop(self, row: dict) -> None:
+        for index, e in (
+            (self._by_exp, self._exp_entry(row)),
+            (self._by_last, self._last_entry(row)),
+        ):
+            if index is None or e is None:
+                continue
+            i = bisect_left(index, e)
+            if i < len(index) and index[i] == e:
+                del index[i]
+        iid = self._row_id(row)
+        if self._trgm is not None and iid is not None:
+            self._trgm.remove(iid)
+
+    @staticmethod
+    def _range_ids(index: list, lo: tuple, hi: tuple) -> set[int]:
+        return {iid for _, iid in index[bisect_left(index, lo) : bisect_right(index, hi)]}
+
+    # id строк под условие по индексу; None - для условия индекса нет
+    def _lookup(self, rows: list[dict], c: Condition) -> set[int] | None:
+        values = c.value if c.op == "in" else (c.value,)
+        if c.field == "experience_years" and c.op in ("eq", "in", "range"):
+            bounds = c.value if c.op == "range" else values
+            if not all(v is None or isinstance(v, (int, float)) for v in bounds):
+                return None
+            index = self._exp_index(rows)
+            if c.op == "range":
+                lo, hi = c.value
+                return self._range_ids(
+                    index,
+                    (-sys.maxsize if lo is None else lo,),
+                    (sys.maxsize if hi is None else hi, sys.maxsize),
+                )
+            found: set[int] = set()
+            for v in values:
+                if v is not None:
+                    found |= self._range_ids(index, (v,), (v, sys.maxsize))
+            return found
+        if c.field == "last_name" and c.op in ("eq", "in", "prefix"):
+            if not all(v is None or isinstance(v, str) for v in values):
+                return None
+            index2 = self._last_index(rows)
+            found = set()
+            for v in values:
+                if v is None:
+                    continue
+                key = v.strip().casefold() if c.op != "prefix" else v.casefold()
+                # префикс без учёта регистра - надмножество точного, лишнее отсеет предикат
+                top = key + "\U0010ffff" if c.op == "prefix" else key
+                found |= self._range_ids(index2, (key,), (top, sys.maxsize))
+            return found
+        return None
+
+    # записи-кандидаты под условия FilterSpec по вторичным индексам (надмножество ответа,
+    # в порядке файла); разбираются только найденные строки. None - ни одно условие не индексируется
+    def find_candidates(self, conditions: Iterable[Condition]) -> list[Instructor] | None:
+        rows = self._rows()
+        ids: set[int] | None = None
+        for c in conditions:
+            found = self._lookup(rows, c)
+            if found is None:
+                continue
+            ids = found if ids is None else ids & found
+            if not ids:
+                break
+        if ids is None:
+            return None
+        pos = self._index(rows)
+        idxs = sorted(pos[i] for i in ids if i in pos)
+        if self._items_cache is not None:
+            return [self._items_cache[i] for i in idxs]
+        return [Instructor(rows[i]) for i in idxs]
+
+    def _trgm_index(self, rows: list[dict]) -> TrigramIndex:
+        if self._trgm is None:
+            index = TrigramIndex()
+            for r in rows:
+                e = self._last_entry(r)
+                if e is not None:
+                    index.add(e[1], r["last_name"])
+            self._trgm = index
+        return self._trgm
+
+    # нечёткий поиск по фамилии (опечатки, часть фамилии, ё/е) - лучшие limit по сходству
+    def search(self, text: str, limit: int = 20) -> list[PublicInstructorProfile]:
+        rows = self._rows()
+        hits = self._trgm_index(rows).search(text, limit)
+        pos = self._index(rows)
+        out = []
+        for iid, _ in hits:
+            idx = pos.get(iid)
+            if idx is None:
+                continue
+            ins = self._items_cache[idx] if self._items_cache is not None else Instructor(rows[idx])
+            out.append(PublicInstructorProfile.from_instructor(ins))
+        return out
+
     # из инструктора в словарь - нужно для других методов
     def _to_dict(self, ins: Instructor) -> dict:
         return {
@@ -34,30 +318,47 @@ class InstructorRepBase(ABC):
 
     ## из файла делаем список объектов
     def read_all(self) -> list[Instructor]:
-        rows = self._load_raw()
-        return [Instructor(r) for r in rows]
+        rows = self._rows()
+        if not self.cached:
+            return [Instructor(r) for r in rows]
+        if self._items_cache is None:
+            self._items_cache = [Instructor(r) for r in rows]
+        return list(self._items_cache)
 
     ## в файл записываем список объектов
     def write_all(self, items: list[Instructor]) -> None:
-        self._save_raw([self._to_dict(x) for x in items])
+        self._persist([self._to_dict(x) for x in items])
+        self._reset_indexes()
+        if self.cached:
+            self._items_cache = list(items)
 
     ## из полученного списка словарей получаем по id
     def get_by_id(self, instructor_id: int) -> Instructor | None:
-        rows = self._load_raw()
-        for r in rows:
-            iid = cast(int | str, r.get("instructor_id"))
-            if iid is not None and int(iid) == instructor_id:
-                return Instructor(r)
-        return None
+        rows = self._rows()
+        idx = self._index(rows).get(instructor_id)
+        if idx is None:
+            return None
+        if self._items_cache is not None:
+            return self._items_cache[idx]
+        return Instructor(rows[idx])
 
     # возвращаем публичные профили
     def get_k_n_short_list(self, k: int, n: int) -> list[PublicInstructorProfile]:
         if k <= 0 or n <= 0:
             return []
-        items = self.read_all()
         start = (k - 1) * n
         end = start + n
-        return [PublicInstructorProfile(i) for i in items[start:end]]
+        if self.cached:
+            rows = self._rows()
+            if self._items_cache is not None:
+                return [
+                    PublicInstructorProfile.from_instructor(i) for i in self._items_cache[start:end]
+                ]
+            page = rows[start:end]
+        else:
+            # без кэша читаем файл потоково и останавливаемся на нужной странице
+            page = list(islice(self._iter_raw(), start, end))
+        return [PublicInstructorProfile.from_instructor(Instructor(r)) for r in page]
 
     # сортируем по фамилии/имени/отчеству
     def sort_by_last_name(self, reverse: bool = False) -> list[Instructor]:
@@ -75,19 +376,13 @@ class InstructorRepBase(ABC):
 
     # автогенерация id
     def add(self, item: Instructor) -> Instructor:
-        rows = self._load_raw()
-        max_id = max(
-            (int(cast(int | str, r.get("instructor_id", 0))) for r in rows),
-            default=0,
-        )
-        duplicate = False
-        for r in rows:
-            if item == Instructor(r):
-                duplicate = True
-                break
-        if duplicate:
-            raise ValueError()
-        new_id = max_id + 1
+        rows = self._rows()
+        pos = self._index(rows)
+        keys = self._key_index(rows)
+        key = self._eq_key(item)
+        if key in keys:
+            raise ValueError("такой Instructor уже существует (равенство по ФИО+стаж)")
+        new_id = self._max_id + 1
         obj = Instructor(
             new_id,
             item.last_name,
@@ -96,15 +391,158 @@ class InstructorRepBase(ABC):
             item.phone,
             item.experience_years,
         )
-        rows.append(self._to_dict(obj))
-        self._save_raw(rows)
+        row = self._to_dict(obj)
+        rows.append(row)
+        self._persist(rows, put=[row])
+        pos[new_id] = len(rows) - 1
+        self._max_id = new_id
+        keys[key] = 1
+        self._secondary_put(row)
+        if self._items_cache is not None:
+            self._items_cache.append(obj)
         return obj
 
     def replace_by_id(self, instructor_id: int, new_item: Instructor) -> bool:
-        rows = self._load_raw()
-        for idx, r in enumerate(rows):
-            iid = cast(int | str, r.get("instructor_id"))
-            if iid is not None and int(iid) == instructor_id:
+        rows = self._rows()
+        idx = self._index(rows).get(instructor_id)
+        if idx is None:
+            return False
+        keys = self._key_index(rows)
+        old_key = self._row_key(rows[idx])
+        new_key = self._eq_key(new_item)
+        if keys.get(new_key, 0) > (1 if new_key == old_key else 0):
+            raise ValueError("такой Instructor уже существует (равенство по ФИО+стаж)")
+        obj = Instructor(
+            instructor_id,
+            new_item.last_name,
+            new_item.first_name,
+            new_item.patronymic,
+            new_item.phone,
+            new_item.experience_years,
+        )
+        old_row = rows[idx]
+        rows[idx] = self._to_dict(obj)
+        self._persist(rows, put=[rows[idx]])
+        self._secondary_drop(old_row)
+        self._secondary_put(rows[idx])
+        self._key_discard(keys, old_key)
+        keys[new_key] = keys.get(new_key, 0) + 1
+        if self._items_cache is not None:
+            self._items_cache[idx] = obj
+        return True
+
+    def delete_by_id(self, instructor_id: int) -> bool:
+        rows = self._rows()
+        pos = self._index(rows)
+        if instructor_id not in pos:
+            return False
+        keys = self._key_index(rows)
+        keep = []
+        gone = []
+        for r in rows:
+            if self._row_id(r) == instructor_id:
+                self._key_discard(keys, self._row_key(r))
+                gone.append(r)
+            else:
+                keep.append(r)
+        self._persist(keep, deleted=[instructor_id])
+        for r in gone:
+            self._secondary_drop(r)
+        if self._items_cache is not None:
+            self._items_cache = [
+                x
+                for x, r in zip(self._items_cache, rows, strict=True)
+                if self._row_id(r) != instructor_id
+            ]
+        # позиции после удалённых строк сдвинулись - пересчитываем только хвост
+        first = pos.pop(instructor_id)
+        seen: set[int] = set()
+        for idx in range(first, len(keep)):
+            iid = self._row_id(keep[idx])
+            if iid is not None and iid not in seen and pos.get(iid, -1) >= first:
+                pos[iid] = idx
+                seen.add(iid)
+        if instructor_id == self._max_id:
+            self._max_id = max(pos, default=0)
+        return True
+
+    def get_count(self) -> int:
+        return len(self._rows())
+
+    ## пакетные операции: одна загрузка, один проход проверок и одна запись на весь пакет
+    def add_many(self, items: list[Instructor]) -> BatchResult:
+        rows = self._rows()
+        self._index(rows)
+        keys = self._key_index(rows)
+        results: list[BatchItemResult] = []
+        new_objs: list[Instructor] = []
+        batch_keys: set[tuple] = set()
+        next_id = self._max_id
+        for i, item in enumerate(items):
+            key = self._eq_key(item)
+            if key in keys or key in batch_keys:
+                results.append(
+                    BatchItemResult(
+                        i, False, error="такой Instructor уже существует (равенство по ФИО+стаж)"
+                    )
+                )
+                continue
+            try:
+                obj = Instructor(
+                    next_id + 1,
+                    item.last_name,
+                    item.first_name,
+                    item.patronymic,
+                    item.phone,
+                    item.experience_years,
+                )
+            except (TypeError, ValueError) as e:
+                results.append(BatchItemResult(i, False, error=str(e)))
+                continue
+            next_id += 1
+            batch_keys.add(key)
+            new_objs.append(obj)
+            results.append(BatchItemResult(i, True, instructor_id=obj.instructor_id))
+        if len(new_objs) != len(items):
+            # пакет отклонён: выделенные id никому не достались
+            return BatchResult(
+                False, [r if not r.ok else BatchItemResult(r.index, True) for r in results]
+            )
+        if not new_objs:
+            return BatchResult(True, results)
+
+        new_rows = [self._to_dict(x) for x in new_objs]
+        items_cache = self._items_cache
+        rows.extend(new_rows)
+        self._persist(rows, put=new_rows)
+        pos = self._index(rows)
+        for idx in range(len(rows) - len(new_rows), len(rows)):
+            iid = cast(int, self._row_id(rows[idx]))
+            pos[iid] = idx
+        self._max_id = next_id
+        keys.update(dict.fromkeys(batch_keys, 1))
+        # вторичные индексы после пакета проще перестроить при следующем запросе
+        self._drop_secondary()
+        if items_cache is not None:
+            items_cache.extend(new_objs)
+        return BatchResult(True, results)
+
+    def replace_many(self, items: list[tuple[int, Instructor]]) -> BatchResult:
+        rows = self._rows()
+        pos = self._index(rows)
+        keys = self._key_index(rows)
+        results: list[BatchItemResult] = []
+        planned: list[tuple[int, int, Instructor]] = []
+        seen: set[int] = set()
+        # как изменятся счётчики ключей после применения всего пакета
+        delta: dict[tuple, int] = {}
+        for i, (instructor_id, new_item) in enumerate(items):
+            idx = pos.get(instructor_id)
+            if idx is None or instructor_id in seen:
+                err = "повтор id в пакете" if idx is not None else "instructor_id не найден"
+                results.append(BatchItemResult(i, False, instructor_id, err))
+                continue
+            try:
                 obj = Instructor(
                     instructor_id,
                     new_item.last_name,
@@ -113,20 +551,78 @@ class InstructorRepBase(ABC):
                     new_item.phone,
                     new_item.experience_years,
                 )
-                rows[idx] = self._to_dict(obj)
-                self._save_raw(rows)
-                return True
-        return False
+            except (TypeError, ValueError) as e:
+                results.append(BatchItemResult(i, False, instructor_id, str(e)))
+                continue
+            seen.add(instructor_id)
+            old_key = self._row_key(rows[idx])
+            new_key = self._eq_key(obj)
+            delta[old_key] = delta.get(old_key, 0) - 1
+            delta[new_key] = delta.get(new_key, 0) + 1
+            planned.append((i, idx, obj))
+            results.append(BatchItemResult(i, True, instructor_id))
 
-    def delete_by_id(self, instructor_id: int) -> bool:
-        rows = self._load_raw()
-        new_rows = [
-            r for r in rows if int(cast(int | str, r.get("instructor_id", -1))) != instructor_id
-        ]
-        deleted = len(new_rows) != len(rows)
-        if deleted:
-            self._save_raw(new_rows)
-        return deleted
+        clashes = {k for k, d in delta.items() if d > 0 and keys.get(k, 0) + d > 1}
+        if clashes:
+            for i, _, obj in planned:
+                if self._eq_key(obj) in clashes:
+                    results[i] = BatchItemResult(
+                        i,
+                        False,
+                        obj.instructor_id,
+                        "такой Instructor уже существует (равенство по ФИО+стаж)",
+                    )
+        if len(planned) != len(items) or clashes:
+            return BatchResult(False, results)
+        if not planned:
+            return BatchResult(True, results)
 
-    def get_count(self) -> int:
-        return len(self._load_raw())
+        items_cache = self._items_cache
+        for _, idx, obj in planned:
+            rows[idx] = self._to_dict(obj)
+        self._persist(rows, put=[rows[idx] for _, idx, _ in planned])
+        self._drop_secondary()
+        for k, d in delta.items():
+            left = keys.get(k, 0) + d
+            if left > 0:
+                keys[k] = left
+            else:
+                keys.pop(k, None)
+        if items_cache is not None:
+            for _, idx, obj in planned:
+                items_cache[idx] = obj
+        return BatchResult(True, results)
+
+    def delete_many(self, instructor_ids: list[int]) -> BatchResult:
+        rows = self._rows()
+        pos = self._index(rows)
+        results: list[BatchItemResult] = []
+        doomed: set[int] = set()
+        for i, instructor_id in enumerate(instructor_ids):
+            if instructor_id not in pos or instructor_id in doomed:
+                err = "повтор id в пакете" if instructor_id in doomed else "instructor_id не найден"
+                results.append(BatchItemResult(i, False, instructor_id, err))
+                continue
+            doomed.add(instructor_id)
+            results.append(BatchItemResult(i, True, instructor_id))
+        if len(doomed) != len(instructor_ids):
+            return BatchResult(False, results)
+        if not doomed:
+            return BatchResult(True, results)
+
+        keys = self._key_index(rows)
+        items_cache = self._items_cache
+        keep_idx = []
+        for idx, r in enumerate(rows):
+            if self._row_id(r) in doomed:
+                self._key_discard(keys, self._row_key(r))
+            else:
+                keep_idx.append(idx)
+        keep = [rows[idx] for idx in keep_idx]
+        self._persist(keep, deleted=list(instructor_ids))
+        # позиции сдвинулись почти везде - индекс id перестроится при следующем обращении
+        self._pos = None
+        self._drop_secondary()
+        if items_cache is not None:
+            self._items_cache = [items_cache[idx] for idx in keep_idx]
+        return BatchResult(True, results)
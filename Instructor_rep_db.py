@@ -1,13 +1,325 @@
 from __future__ import annotations
 
-from db_singleton import PostgresDB
+from collections.abc import Iterable, Iterator
+import io
+from itertools import chain
+from typing import Any
+
+from db_singleton import PostgresDB, UniqueViolation
 from Instructor import Instructor
+from instructor_repo_iface import BatchItemResult, BatchResult, BulkLoadReport
+import keyset
+from migrations import FIO_EXP_COLUMNS, FIO_EXP_INDEX, FOLD_LAST_NAME_SQL
 from PublicInstructorProfile import PublicInstructorProfile
+from trigram_index import best_names, fold, trigrams
+
+_DUP_ERROR = "такой Instructor уже существует (равенство по ФИО+стаж)"
+
+# ON CONFLICT только по ФИО+стаж: повтор гасится (0 строк), а занятый id или любое другое
+# ограничение дают UniqueViolation. Совпадение ФИО+стаж проверяется первым, как раньше
+_INSERT_SQL = f"""
+    INSERT INTO instructors (instructor_id, last_name, first_name, patronymic, phone, experience_years)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON CONFLICT ({FIO_EXP_COLUMNS}) DO NOTHING
+"""
+
+_UPDATE_SQL = """
+    UPDATE instructors
+    SET last_name=%s, first_name=%s, patronymic=%s, phone=%s, experience_years=%s
+    WHERE instructor_id=%s
+"""
+_DELETE_SQL = "DELETE FROM instructors WHERE instructor_id=%s"
+_FIO_EXP_PRESENT_SQL = f"SELECT to_regclass('{FIO_EXP_INDEX}') IS NOT NULL AS present"
+
+# ---------- SQL пакетных операций (общий с Instructor_rep_db_async) ----------
+
+# строк пакета на один запрос (по 6-7 параметров на строку)
+_BATCH_CHUNK = 500
+# id на один запрос проверки существования
+_ID_CHUNK = 1000
+
+_BATCH_COLUMNS = "instructor_id, last_name, first_name, patronymic, phone, experience_years"
+# типы указаны явно: иначе параметры внутри VALUES сервер считает text
+_BATCH_ROW = (
+    "(CAST(%s AS INTEGER), CAST(%s AS INTEGER), CAST(%s AS TEXT), CAST(%s AS TEXT),"
+    " CAST(%s AS TEXT), CAST(%s AS TEXT), CAST(%s AS INTEGER))"
+)
+# столбцы VALUES и в PostgreSQL, и в SQLite называются column1, column2, ...
+_BATCH_SELECT = ", ".join(
+    f"column{i} AS {name}" for i, name in enumerate(("ord", *_BATCH_COLUMNS.split(", ")), 1)
+)
+
+
+# пачка пакета как таблица batch: ord - номер элемента в пакете. Подзапрос, а не WITH:
+# sqlite3 не считает rowcount у UPDATE, начинающегося с WITH
+def _batch_table(n: int) -> str:
+    return f"(SELECT {_BATCH_SELECT} FROM (VALUES {', '.join([_BATCH_ROW] * n)}) AS v) AS batch"
+
+
+def _batch_params(rows: list[tuple[int, int, Instructor]]) -> tuple:
+    return tuple(
+        chain.from_iterable(
+            (o, iid, x.last_name, x.first_name, x.patronymic, x.phone, x.experience_years)
+            for o, iid, x in rows
+        )
+    )
+
+
+# элементы пачки (ord), чьи ФИО+стаж уже заняты другой строкой таблицы, - одним запросом
+def _dup_ords_sql(n: int) -> str:
+    return f"""
+    SELECT batch.ord
+    FROM {_batch_table(n)}
+    JOIN instructors i
+      ON i.last_name = batch.last_name
+     AND i.first_name = batch.first_name
+     AND COALESCE(i.patronymic, '') = COALESCE(batch.patronymic, '')
+     AND i.experience_years = batch.experience_years
+    WHERE i.instructor_id <> batch.instructor_id
+    """
+
+
+def _insert_many_sql(n: int) -> str:
+    rows = ", ".join(["(%s, %s, %s, %s, %s, %s)"] * n)
+    return f"INSERT INTO instructors ({_BATCH_COLUMNS}) VALUES {rows}"
+
+
+def _insert_params(items: list[Instructor]) -> tuple:
+    return tuple(
+        chain.from_iterable(
+            (x.instructor_id, x.last_name, x.first_name, x.patronymic, x.phone, x.experience_years)
+            for x in items
+        )
+    )
+
+
+def _update_many_sql(n: int) -> str:
+    return f"""
+    UPDATE instructors
+    SET last_name = batch.last_name, first_name = batch.first_name,
+        patronymic = batch.patronymic, phone = batch.phone,
+        experience_years = batch.experience_years
+    FROM {_batch_table(n)}
+    WHERE instructors.instructor_id = batch.instructor_id
+    """
+
+
+def _existing_ids_sql(n: int) -> str:
+    return f"SELECT instructor_id FROM instructors WHERE instructor_id IN ({', '.join(['%s'] * n)})"
+
+
+def _batch_key(item: Instructor) -> tuple:
+    return (item.last_name, item.first_name, item.patronymic or "", item.experience_years)
+
+
+def _valid_id(iid: object) -> bool:
+    return isinstance(iid, int) and iid > 0
+
+
+# проверка add_many по уже прочитанным занятым id и совпадениям ФИО+стаж (dups - номера элементов)
+def _add_results(
+    items: list[Instructor], existing: set[int], dups: set[int]
+) -> list[BatchItemResult]:
+    results: list[BatchItemResult] = []
+    seen_ids: set[int] = set()
+    seen_keys: set[tuple] = set()
+    for i, item in enumerate(items):
+        iid = item.instructor_id
+        key = _batch_key(item)
+        if not _valid_id(iid):
+            err = "instructor_id обязателен и должен быть > 0"
+        elif iid in existing or iid in seen_ids:
+            err = f"instructor_id {iid} уже существует"
+        elif key in seen_keys or i in dups:
+            err = _DUP_ERROR
+        else:
+            err = None
+        results.append(BatchItemResult(i, err is None, iid, err))
+        seen_ids.add(iid)
+        seen_keys.add(key)
+    return results
+
+
+def _replace_results(
+    items: list[tuple[int, Instructor]], existing: set[int], dups: set[int]
+) -> list[BatchItemResult]:
+    results: list[BatchItemResult] = []
+    seen_ids: set[int] = set()
+    seen_keys: set[tuple] = set()
+    for i, (iid, new_item) in enumerate(items):
+        key = _batch_key(new_item)
+        if iid not in existing:
+            err = "instructor_id не найден"
+        elif iid in seen_ids:
+            err = "повтор id в пакете"
+        elif key in seen_keys or i in dups:
+            err = _DUP_ERROR
+        else:
+            err = None
+        results.append(BatchItemResult(i, err is None, iid, err))
+        seen_ids.add(iid)
+        seen_keys.add(key)
+    return results
+
+
+# результаты пакета, где строки gone успели удалить между проверкой и записью
+def _mark_gone(results: list[BatchItemResult], gone: set[int]) -> list[BatchItemResult]:
+    return [
+        (
+            BatchItemResult(r.index, False, r.instructor_id, "instructor_id не найден")
+            if r.instructor_id in gone
+            else r
+        )
+        for r in results
+    ]
+
+
+# пакет откатила параллельная запись; если повторная проверка виновника уже не находит
+# (строку успели удалить), отказ получают все элементы
+def _mark_race(results: list[BatchItemResult]) -> list[BatchItemResult]:
+    if any(not r.ok for r in results):
+        return results
+    return [
+        BatchItemResult(r.index, False, r.instructor_id, "конфликт с параллельной записью")
+        for r in results
+    ]
+
+
+# строк на один COPY при массовой загрузке
+_BULK_CHUNK = 50_000
+
+_STAGE_COLUMNS = "ord, instructor_id, last_name, first_name, patronymic, phone, experience_years"
+_STAGE_DDL = """
+    ord              BIGINT,
+    instructor_id    INTEGER,
+    last_name        TEXT,
+    first_name       TEXT,
+    patronymic       TEXT,
+    phone            TEXT,
+    experience_years INTEGER,
+    reason           TEXT
+"""
+
+# отбраковка сразу по всему набору: сначала конфликты id (с таблицей и внутри загрузки),
+# затем ФИО+стаж среди оставшихся; из повторов внутри загрузки проходит первая строка
+_BULK_REJECT_SQL = (
+    """
+    UPDATE instructors_stage SET reason = 'id'
+    WHERE instructor_id IN (SELECT instructor_id FROM instructors)
+       OR ord IN (
+           SELECT ord FROM (
+               SELECT ord, ROW_NUMBER() OVER (PARTITION BY instructor_id ORDER BY ord) AS rn
+               FROM instructors_stage
+           ) t
+           WHERE rn > 1
+       )
+    """,
+    """
+    UPDATE instructors_stage SET reason = 'dup'
+    WHERE reason IS NULL
+      AND (
+        EXISTS (
+            SELECT 1
+            FROM instructors i
+            WHERE i.last_name = instructors_stage.last_name
+              AND i.first_name = instructors_stage.first_name
+              AND COALESCE(i.patronymic, '') = COALESCE(instructors_stage.patronymic, '')
+              AND i.experience_years = instructors_stage.experience_years
+        )
+        OR ord IN (
+            SELECT ord FROM (
+                SELECT ord, ROW_NUMBER() OVER (
+                    PARTITION BY last_name, first_name, COALESCE(patronymic, ''), experience_years
+                    ORDER BY ord
+                ) AS rn
+                FROM instructors_stage
+                WHERE reason IS NULL
+            ) t
+            WHERE rn > 1
+        )
+      )
+    """,
+)
+
+# ON CONFLICT - на случай параллельной записи между отбраковкой и вставкой
+_BULK_INSERT_SQL = """
+    INSERT INTO instructors (instructor_id, last_name, first_name, patronymic, phone, experience_years)
+    SELECT instructor_id, last_name, first_name, patronymic, phone, experience_years
+    FROM instructors_stage
+    WHERE reason IS NULL
+    ORDER BY ord
+    ON CONFLICT DO NOTHING
+"""
+
+# принятые строки, которых после вставки нет в таблице, - их перехватила параллельная запись
+_BULK_LOST_SQL = """
+    UPDATE instructors_stage SET reason = 'lost'
+    WHERE reason IS NULL
+      AND NOT EXISTS (
+        SELECT 1
+        FROM instructors i
+        WHERE i.instructor_id = instructors_stage.instructor_id
+          AND i.last_name = instructors_stage.last_name
+          AND i.first_name = instructors_stage.first_name
+          AND COALESCE(i.patronymic, '') = COALESCE(instructors_stage.patronymic, '')
+          AND i.phone = instructors_stage.phone
+          AND i.experience_years = instructors_stage.experience_years
+      )
+"""
+
+# экранирование текстового формата COPY; NULL - \N
+_COPY_ESCAPE = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_text(value: str | None) -> str:
+    return "\\N" if value is None else value.translate(_COPY_ESCAPE)
+
+
+# trigram_index.fold() на стороне SQL: нижний регистр, ё -> е, сравнение по кодам символов
+_FOLD_SORT_SQL = "replace(lower(last_name), 'ё', 'е') COLLATE \"C\""
+
+# нечёткий поиск через pg_trgm: "%" идёт по GIN-индексу свёрнутой фамилии (миграция 6)
+# с порогом pg_trgm.similarity_threshold, лучшие - по убыванию similarity(); равные по
+# сходству - по свёрнутой фамилии и id, как в TrigramIndex
+_SEARCH_TRGM_SQL = f"""
+SELECT instructor_id, last_name, first_name, patronymic, phone, experience_years
+FROM instructors
+WHERE {FOLD_LAST_NAME_SQL} %% %s
+ORDER BY similarity({FOLD_LAST_NAME_SQL}, %s) DESC, {_FOLD_SORT_SQL}, instructor_id
+LIMIT %s
+"""
+_NAME_COUNTS_SQL = "SELECT last_name, COUNT(*) AS c FROM instructors GROUP BY last_name"
+
+
+def _by_last_names_sql(n: int) -> str:
+    return f"""
+    SELECT instructor_id, last_name, first_name, patronymic, phone, experience_years
+    FROM instructors
+    WHERE last_name IN ({", ".join(["%s"] * n)})
+    """
+
+
+# строки фамилий names (порядок best_names) по свёрнутой фамилии и id: написания с ё/е
+# перемешиваются по id, как в TrigramIndex
+def _rank_rows(rows: list[dict[str, Any]], names: list[str], limit: int) -> list[dict[str, Any]]:
+    rank: dict[str, int] = {}
+    for name in names:
+        rank.setdefault(fold(name), len(rank))
+    rows.sort(key=lambda r: (rank[fold(r["last_name"])], r["instructor_id"]))
+    return rows[:limit]
+
+
+# откат пакета, если что-то не прошло уже внутри транзакции
+class _BatchRollback(Exception):
+    pass
 
 
 class InstructorRepDB:
     def __init__(self, db: PostgresDB) -> None:
         self.db = db
+        self._schema_checked = False
+        # установлено ли расширение pg_trgm (проверяется при первом поиске)
+        self._has_pg_trgm: bool | None = None
 
     def close(self) -> None:
         pass
@@ -19,7 +331,7 @@ class InstructorRepDB:
         WHERE instructor_id = %s
         """
         row = self.db.fetchone(sql, (instructor_id,))
-        return Instructor(row) if row else None
+        return Instructor.from_validated_row(row) if row else None
 
     def get_k_n_short_list(self, k: int, n: int) -> list[PublicInstructorProfile]:
         if k <= 0 or n <= 0:
@@ -32,11 +344,23 @@ class InstructorRepDB:
         LIMIT %s OFFSET %s
         """
         rows = self.db.fetchall(sql, (n, offset))
-        return [PublicInstructorProfile(r) for r in rows]
+        return [PublicInstructorProfile.from_validated_row(r) for r in rows]
 
-    def sort_by_last_name(self, reverse: bool = False) -> list[Instructor]:
+    # то же, что get_k_n_short_list, но без OFFSET: продолжение по курсору предыдущей страницы
+    def get_keyset_page(
+        self, n: int, cursor: str | None = None
+    ) -> tuple[list[PublicInstructorProfile], str | None]:
+        if n <= 0:
+            return [], None
+        order = keyset.parse_order(None, {})
+        sql, params = keyset.page_sql(order, cursor, n)
+        rows, next_cursor = keyset.split_page(order, self.db.fetchall(sql, params), n)
+        return [PublicInstructorProfile.from_validated_row(r) for r in rows], next_cursor
+
+    @staticmethod
+    def _sorted_sql(reverse: bool) -> str:
         direction = "DESC" if reverse else "ASC"
-        sql = f"""
+        return f"""
         SELECT instructor_id, last_name, first_name, patronymic, phone, experience_years
         FROM instructors
         ORDER BY last_name {direction},
@@ -44,47 +368,78 @@ class InstructorRepDB:
                  patronymic {direction} NULLS LAST,
                  instructor_id {direction}
         """
-        rows = self.db.fetchall(sql)
-        return [Instructor(r) for r in rows]
 
+    def sort_by_last_name(self, reverse: bool = False) -> list[Instructor]:
+        rows = self.db.fetchall(self._sorted_sql(reverse))
+        return [Instructor.from_validated_row(r) for r in rows]
+
+    # потоковый аналог sort_by_last_name: строки идут пачками с серверного курсора,
+    # память не зависит от размера таблицы
+    def iter_all(self, batch_size: int = 1000, reverse: bool = False) -> Iterator[Instructor]:
+        for r in self.db.iter_rows(self._sorted_sql(reverse), batch_size=batch_size):
+            yield Instructor.from_validated_row(r)
+
+    def _pg_trgm(self) -> bool:
+        if self._has_pg_trgm is None:
+            row = self.db.fetchone("SELECT 1 AS ok FROM pg_extension WHERE extname = 'pg_trgm'")
+            self._has_pg_trgm = row is not None
+        return self._has_pg_trgm
+
+    # нечёткий поиск по фамилии (опечатки, часть фамилии, ё/е) - лучшие limit по сходству
+    def search(self, text: str, limit: int = 20) -> list[PublicInstructorProfile]:
+        if limit <= 0 or not trigrams(text):
+            return []
+        if self._pg_trgm():
+            q = fold(text)
+            rows = self.db.fetchall(_SEARCH_TRGM_SQL, (q, q, limit))
+        else:
+            rows = self._search_fallback(text, limit)
+        return [PublicInstructorProfile.from_validated_row(r) for r in rows]
+
+    # без pg_trgm: то же сходство считаем в Python по различным фамилиям,
+    # а строки читаем только для лучших из них
+    def _search_fallback(self, text: str, limit: int) -> list[dict[str, Any]]:
+        counts = self.db.fetchall(_NAME_COUNTS_SQL)
+        names = best_names(text, ((r["last_name"], int(r["c"])) for r in counts), limit)
+        if not names:
+            return []
+        sql = _by_last_names_sql(len(names))
+        return _rank_rows(self.db.fetchall(sql, tuple(names)), names, limit)
+
+    # равенство ФИО+стаж держит уникальный индекс по выражению (миграция 3, migrations.py);
+    # add/replace_by_id опираются на него. Схему меняет только migrate(), здесь - лишь проверка
+    def _check_schema_once(self) -> None:
+        if self._schema_checked:
+            return
+        row = self.db.fetchone(_FIO_EXP_PRESENT_SQL)
+        if not row or not row["present"]:
+            raise RuntimeError(
+                f"нет индекса {FIO_EXP_INDEX}: примените миграции (migrations.migrate)"
+            )
+        self._schema_checked = True
+
+    # одна вставка без предварительных проверок: причину отказа даёт сам INSERT
     def add(self, item: Instructor) -> Instructor:
         if not isinstance(item.instructor_id, int) or item.instructor_id <= 0:
             raise ValueError("instructor_id обязателен и должен быть > 0")
+        self._check_schema_once()
 
-        dup_row = self.db.fetchone(
-            """
-            SELECT 1
-            FROM instructors
-            WHERE last_name=%s AND first_name=%s
-              AND COALESCE(patronymic,'') = COALESCE(%s,'')
-              AND experience_years=%s
-            LIMIT 1
-        """,
-            (item.last_name, item.first_name, item.patronymic, item.experience_years),
-        )
-        if dup_row:
-            raise ValueError("такой Instructor уже существует (равенство по ФИО+стаж)")
-
-        id_row = self.db.fetchone(
-            "SELECT 1 FROM instructors WHERE instructor_id=%s", (item.instructor_id,)
-        )
-        if id_row:
-            raise ValueError(f"instructor_id {item.instructor_id} уже существует")
-
-        self.db.execute(
-            """
-            INSERT INTO instructors (instructor_id, last_name, first_name, patronymic, phone, experience_years)
-            VALUES (%s, %s, %s, %s, %s, %s)
-        """,
-            (
-                item.instructor_id,
-                item.last_name,
-                item.first_name,
-                item.patronymic,
-                item.phone,
-                item.experience_years,
-            ),
+        params = (
+            item.instructor_id,
+            item.last_name,
+            item.first_name,
+            item.patronymic,
+            item.phone,
+            item.experience_years,
         )
+        try:
+            inserted = self.db.execute(_INSERT_SQL, params)
+        except UniqueViolation as e:
+            if e.constraint != "instructors_pkey":
+                raise
+            raise ValueError(f"instructor_id {item.instructor_id} уже существует") from None
+        if inserted == 0:
+            raise ValueError(_DUP_ERROR)
 
         return Instructor(
             item.instructor_id,
@@ -98,49 +453,213 @@ class InstructorRepDB:
     def replace_by_id(self, instructor_id: int, new_item: Instructor) -> bool:
         if not isinstance(instructor_id, int) or instructor_id <= 0:
             raise ValueError("instructor_id должен быть > 0")
+        self._check_schema_once()
 
-        dup_row = self.db.fetchone(
-            """
-            SELECT 1
-            FROM instructors
-            WHERE last_name=%s AND first_name=%s
-            AND COALESCE(patronymic,'') = COALESCE(%s,'')
-            AND experience_years=%s
-            AND instructor_id <> %s
-            LIMIT 1
-            """,
-            (
-                new_item.last_name,
-                new_item.first_name,
-                new_item.patronymic,
-                new_item.experience_years,
-                instructor_id,
-            ),
-        )
-        if dup_row:
-            raise ValueError("такой Instructor уже существует (равенство по ФИО+стаж)")
-
-        count = self.db.execute(
-            """
-            UPDATE instructors
-            SET last_name=%s, first_name=%s, patronymic=%s, phone=%s, experience_years=%s
-            WHERE instructor_id=%s
-            """,
-            (
-                new_item.last_name,
-                new_item.first_name,
-                new_item.patronymic,
-                new_item.phone,
-                new_item.experience_years,
-                instructor_id,
-            ),
-        )
+        try:
+            count = self.db.execute(
+                _UPDATE_SQL,
+                (
+                    new_item.last_name,
+                    new_item.first_name,
+                    new_item.patronymic,
+                    new_item.phone,
+                    new_item.experience_years,
+                    instructor_id,
+                ),
+            )
+        except UniqueViolation as e:
+            if e.constraint != FIO_EXP_INDEX:
+                raise
+            raise ValueError(_DUP_ERROR) from None
         return count > 0
 
     def delete_by_id(self, instructor_id: int) -> bool:
-        count = self.db.execute("DELETE FROM instructors WHERE instructor_id=%s", (instructor_id,))
+        count = self.db.execute(_DELETE_SQL, (instructor_id,))
         return count > 0
 
     def get_count(self) -> int:
         row = self.db.fetchone("SELECT COUNT(*) AS c FROM instructors")
         return int(row["c"]) if row else 0
+
+    # ---------- пакетные операции: проверки целиком, запись одной транзакцией ----------
+
+    def _existing_ids(self, ids: list[int]) -> set[int]:
+        found: set[int] = set()
+        for i in range(0, len(ids), _ID_CHUNK):
+            chunk = ids[i : i + _ID_CHUNK]
+            rows = self.db.fetchall(_existing_ids_sql(len(chunk)), tuple(chunk))
+            found.update(int(r["instructor_id"]) for r in rows)
+        return found
+
+    def _duplicate_ords(self, rows: list[tuple[int, int, Instructor]]) -> set[int]:
+        found: set[int] = set()
+        for i in range(0, len(rows), _BATCH_CHUNK):
+            chunk = rows[i : i + _BATCH_CHUNK]
+            found.update(
+                int(r["ord"])
+                for r in self.db.fetchall(_dup_ords_sql(len(chunk)), _batch_params(chunk))
+            )
+        return found
+
+    def _check_add(self, items: list[Instructor]) -> list[BatchItemResult]:
+        rows = [(i, x.instructor_id, x) for i, x in enumerate(items) if _valid_id(x.instructor_id)]
+        existing = self._existing_ids([iid for _, iid, _ in rows])
+        return _add_results(items, existing, self._duplicate_ords(rows))
+
+    def _check_replace(self, items: list[tuple[int, Instructor]]) -> list[BatchItemResult]:
+        existing = self._existing_ids([iid for iid, _ in items])
+        dups = self._duplicate_ords([(i, iid, x) for i, (iid, x) in enumerate(items)])
+        return _replace_results(items, existing, dups)
+
+    # проверки и вставка - в одной транзакции, по запросу на пачку
+    def add_many(self, items: list[Instructor]) -> BatchResult:
+        try:
+            with self.db.transaction():
+                results = self._check_add(items)
+                if any(not r.ok for r in results):
+                    return BatchResult(False, results)
+                for i in range(0, len(items), _BATCH_CHUNK):
+                    chunk = items[i : i + _BATCH_CHUNK]
+                    try:
+                        self.db.execute(_insert_many_sql(len(chunk)), _insert_params(chunk))
+                    except UniqueViolation as e:
+                        if e.constraint not in (FIO_EXP_INDEX, "instructors_pkey"):
+                            raise
+                        raise _BatchRollback() from e
+        except _BatchRollback:
+            # id или ФИО+стаж заняла параллельная запись - причину ищем повторной проверкой
+            return BatchResult(False, _mark_race(self._check_add(items)))
+        return BatchResult(True, results)
+
+    def replace_many(self, items: list[tuple[int, Instructor]]) -> BatchResult:
+        try:
+            with self.db.transaction():
+                results = self._check_replace(items)
+                if any(not r.ok for r in results):
+                    return BatchResult(False, results)
+                updated = 0
+                for i in range(0, len(items), _BATCH_CHUNK):
+                    chunk = [
+                        (o, iid, x) for o, (iid, x) in enumerate(items[i : i + _BATCH_CHUNK], i)
+                    ]
+                    try:
+                        updated += self.db.execute(
+                            _update_many_sql(len(chunk)), _batch_params(chunk)
+                        )
+                    except UniqueViolation as e:
+                        if e.constraint != FIO_EXP_INDEX:
+                            raise
+                        raise _BatchRollback() from e
+                if updated < len(items):
+                    # строки успели удалить между проверкой и обновлением
+                    ids = [iid for iid, _ in items]
+                    raise _BatchRollback(set(ids) - self._existing_ids(ids))
+        except _BatchRollback as e:
+            if e.args and e.args[0]:
+                return BatchResult(False, _mark_gone(results, e.args[0]))
+            return BatchResult(False, _mark_race(self._check_replace(items)))
+        return BatchResult(True, results)
+
+    def delete_many(self, instructor_ids: list[int]) -> BatchResult:
+        results: list[BatchItemResult] = []
+        existing = self._existing_ids(list(instructor_ids))
+        seen: set[int] = set()
+        for i, iid in enumerate(instructor_ids):
+            if iid not in existing:
+                err = "instructor_id не найден"
+            elif iid in seen:
+                err = "повтор id в пакете"
+            else:
+                err = None
+            results.append(BatchItemResult(i, err is None, iid, err))
+            seen.add(iid)
+        if any(not r.ok for r in results):
+            return BatchResult(False, results)
+
+        try:
+            with self.db.transaction():
+                for iid in instructor_ids:
+                    if self.db.execute(_DELETE_SQL, (iid,)) == 0:
+                        raise _BatchRollback({iid})
+        except _BatchRollback as e:
+            return BatchResult(False, _mark_gone(results, e.args[0]))
+        return BatchResult(True, results)
+
+    # ---------- массовая загрузка ----------
+
+    # проверка объектов на клиенте, COPY в staging-таблицу и отбраковка конфликтов по множеству;
+    # в отличие от add_many корректные строки записываются, отвергнутые - в отчёте
+    def bulk_load(self, items: Iterable[Instructor | dict[str, Any]]) -> BulkLoadReport:
+        rejected: list[BatchItemResult] = []
+        with self.db.transaction():
+            self._create_stage()
+            chunk: list[tuple] = []
+            for i, item in enumerate(items):
+                if isinstance(item, dict):
+                    raw = item
+                    try:
+                        item = Instructor(raw)
+                    except (TypeError, ValueError) as e:
+                        raw_id = raw.get("instructor_id")
+                        rejected.append(
+                            BatchItemResult(
+                                i, False, raw_id if isinstance(raw_id, int) else None, str(e)
+                            )
+                        )
+                        continue
+                chunk.append(
+                    (
+                        i,
+                        item.instructor_id,
+                        item.last_name,
+                        item.first_name,
+                        item.patronymic,
+                        item.phone,
+                        item.experience_years,
+                    )
+                )
+                if len(chunk) >= _BULK_CHUNK:
+                    self._fill_stage(chunk)
+                    chunk = []
+            if chunk:
+                self._fill_stage(chunk)
+
+            self.db.execute("ANALYZE instructors_stage")
+            for sql in _BULK_REJECT_SQL:
+                self.db.execute(sql)
+            row = self.db.fetchone(
+                "SELECT COUNT(*) AS c FROM instructors_stage WHERE reason IS NULL"
+            )
+            accepted = int(row["c"]) if row else 0
+            loaded = self.db.execute(_BULK_INSERT_SQL)
+            if loaded < accepted:
+                self.db.execute(_BULK_LOST_SQL)
+
+            for r in self.db.fetchall(
+                "SELECT ord, instructor_id, reason FROM instructors_stage WHERE reason IS NOT NULL"
+            ):
+                iid = int(r["instructor_id"])
+                if r["reason"] == "id":
+                    err = f"instructor_id {iid} уже существует"
+                elif r["reason"] == "dup":
+                    err = _DUP_ERROR
+                else:
+                    err = "конфликт с параллельной записью"
+                rejected.append(BatchItemResult(int(r["ord"]), False, iid, err))
+            self.db.execute("DROP TABLE instructors_stage")
+
+        rejected.sort(key=lambda r: r.index)
+        return BulkLoadReport(loaded, rejected)
+
+    def _create_stage(self) -> None:
+        self.db.execute(f"CREATE TEMP TABLE instructors_stage ({_STAGE_DDL}) ON COMMIT DROP")
+
+    def _fill_stage(self, rows: list[tuple]) -> None:
+        buf = io.StringIO()
+        for o, iid, last, first, patr, phone, exp in rows:
+            buf.write(
+                f"{o}\t{iid}\t{_copy_text(last)}\t{_copy_text(first)}\t{_copy_text(patr)}"
+                f"\t{_copy_text(phone)}\t{exp}\n"
+            )
+        buf.seek(0)
+        self.db.copy_from(f"COPY instructors_stage ({_STAGE_COLUMNS}) FROM STDIN", buf)
@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from typing import Any
+
+from async_db import AsyncPostgresDB
+from db_singleton import UniqueViolation
+from Instructor import Instructor
+from Instructor_rep_db import (
+    _BATCH_CHUNK,
+    _DELETE_SQL,
+    _DUP_ERROR,
+    _FIO_EXP_PRESENT_SQL,
+    _ID_CHUNK,
+    _INSERT_SQL,
+    _NAME_COUNTS_SQL,
+    _SEARCH_TRGM_SQL,
+    _UPDATE_SQL,
+    _add_results,
+    _batch_params,
+    _BatchRollback,
+    _by_last_names_sql,
+    _dup_ords_sql,
+    _existing_ids_sql,
+    _insert_many_sql,
+    _insert_params,
+    _mark_gone,
+    _mark_race,
+    _rank_rows,
+    _replace_results,
+    _update_many_sql,
+    _valid_id,
+)
+from instructor_repo_iface import BatchItemResult, BatchResult
+import keyset
+from migrations import FIO_EXP_INDEX
+from PublicInstructorProfile import PublicInstructorProfile
+from trigram_index import best_names, fold, trigrams
+
+
+# асинхронный двойник InstructorRepDB: тот же SQL, но через AsyncPostgresDB
+class AsyncInstructorRepDB:
+    def __init__(self, db: AsyncPostgresDB) -> None:
+        self.db = db
+        self._schema_checked = False
+        self._has_pg_trgm: bool | None = None
+
+    async def close(self) -> None:
+        await self.db.close()
+
+    async def get_by_id(self, instructor_id: int) -> Instructor | None:
+        sql = """
+        SELECT instructor_id, last_name, first_name, patronymic, phone, experience_years
+        FROM instructors
+        WHERE instructor_id = %s
+        """
+        row = await self.db.fetchone(sql, (instructor_id,))
+        return Instructor.from_validated_row(row) if row else None
+
+    async def get_k_n_short_list(self, k: int, n: int) -> list[PublicInstructorProfile]:
+        if k <= 0 or n <= 0:
+            return []
+        offset = (k - 1) * n
+        sql = """
+        SELECT instructor_id, last_name, first_name, patronymic, phone, experience_years
+        FROM instructors
+        ORDER BY last_name ASC, first_name ASC, patronymic ASC NULLS LAST, instructor_id ASC
+        LIMIT %s OFFSET %s
+        """
+        rows = await self.db.fetchall(sql, (n, offset))
+        return [PublicInstructorProfile.from_validated_row(r) for r in rows]
+
+    async def get_keyset_page(
+        self, n: int, cursor: str | None = None
+    ) -> tuple[list[PublicInstructorProfile], str | None]:
+        if n <= 0:
+            return [], None
+        order = keyset.parse_order(None, {})
+        sql, params = keyset.page_sql(order, cursor, n)
+        rows, next_cursor = keyset.split_page(order, await self.db.fetchall(sql, params), n)
+        return [PublicInstructorProfile.from_validated_row(r) for r in rows], next_cursor
+
+    @staticmethod
+    def _sorted_sql(reverse: bool) -> str:
+        direction = "DESC" if reverse else "ASC"
+        return f"""
+        SELECT instructor_id, last_name, first_name, patronymic, phone, experience_years
+        FROM instructors
+        ORDER BY last_name {direction},
+                 first_name {direction},
+                 patronymic {direction} NULLS LAST,
+                 instructor_id {direction}
+        """
+
+    async def sort_by_last_name(self, reverse: bool = False) -> list[Instructor]:
+        rows = await self.db.fetchall(self._sorted_sql(reverse))
+        return [Instructor.from_validated_row(r) for r in rows]
+
+    # потоковый аналог sort_by_last_name: строки идут пачками с серверного курсора,
+    # память не зависит от размера таблицы
+    async def iter_all(
+        self, batch_size: int = 1000, reverse: bool = False
+    ) -> AsyncIterator[Instructor]:
+        async for r in self.db.iter_rows(self._sorted_sql(reverse), batch_size=batch_size):
+            yield Instructor.from_validated_row(r)
+
+    async def _pg_trgm(self) -> bool:
+        if self._has_pg_trgm is None:
+            row = await self.db.fetchone(
+                "SELECT 1 AS ok FROM pg_extension WHERE extname = 'pg_trgm'"
+            )
+            self._has_pg_trgm = row is not None
+        return self._has_pg_trgm
+
+    async def search(self, text: str, limit: int = 20) -> list[PublicInstructorProfile]:
+        if limit <= 0 or not trigrams(text):
+            return []
+        if await self._pg_trgm():
+            q = fold(text)
+            rows = await self.db.fetchall(_SEARCH_TRGM_SQL, (q, q, limit))
+        else:
+            rows = await self._search_fallback(text, limit)
+        return [PublicInstructorProfile.from_validated_row(r) for r in rows]
+
+    async def _search_fallback(self, text: str, limit: int) -> list[dict[str, Any]]:
+        counts = await self.db.fetchall(_NAME_COUNTS_SQL)
+        names = best_names(text, ((r["last_name"], int(r["c"])) for r in counts), limit)
+        if not names:
+            return []
+        sql = _by_last_names_sql(len(names))
+        return _rank_rows(await self.db.fetchall(sql, tuple(names)), names, limit)
+
+    # равенство ФИО+стаж держит уникальный индекс по выражению (миграция 3, migrations.py);
+    # add/replace_by_id опираются на него. Схему меняет только migrate(), здесь - лишь проверка
+    async def _check_schema_once(self) -> None:
+        if self._schema_checked:
+            return
+        row = await self.db.fetchone(_FIO_EXP_PRESENT_SQL)
+        if not row or not row["present"]:
+            raise RuntimeError(
+                f"нет индекса {FIO_EXP_INDEX}: примените миграции (migrations.migrate)"
+            )
+        self._schema_checked = True
+
+    # одна вставка без предварительных проверок: причину отказа даёт сам INSERT
+    async def add(self, item: Instructor) -> Instructor:
+        if not isinstance(item.instructor_id, int) or item.instructor_id <= 0:
+            raise ValueError("instructor_id обязателен и должен быть > 0")
+        await self._check_schema_once()
+
+        params = (
+            item.instructor_id,
+            item.last_name,
+            item.first_name,
+            item.patronymic,
+            item.phone,
+            item.experience_years,
+        )
+        try:
+            inserted = await self.db.execute(_INSERT_SQL, params)
+        except UniqueViolation as e:
+            if e.constraint != "instructors_pkey":
+                raise
+            raise ValueError(f"instructor_id {item.instructor_id} уже существует") from None
+        if inserted == 0:
+            raise ValueError(_DUP_ERROR)
+
+        return Instructor(
+            item.instructor_id,
+            item.last_name,
+            item.first_name,
+            item.patronymic,
+            item.phone,
+            item.experience_years,
+        )
+
+    async def replace_by_id(self, instructor_id: int, new_item: Instructor) -> bool:
+        if not isinstance(instructor_id, int) or instructor_id <= 0:
+            raise ValueError("instructor_id должен быть > 0")
+        await self._check_schema_once()
+
+        try:
+            count = await self.db.execute(
+                _UPDATE_SQL,
+                (
+                    new_item.last_name,
+                    new_item.first_name,
+                    new_item.patronymic,
+                    new_item.phone,
+                    new_item.experience_years,
+                    instructor_id,
+                ),
+            )
+        except UniqueViolation as e:
+            if e.constraint != FIO_EXP_INDEX:
+                raise
+            raise ValueError(_DUP_ERROR) from None
+        return count > 0
+
+    async def delete_by_id(self, instructor_id: int) -> bool:
+        count = await self.db.execute(_DELETE_SQL, (instructor_id,))
+        return count > 0
+
+    async def get_count(self) -> int:
+        row = await self.db.fetchone("SELECT COUNT(*) AS c FROM instructors")
+        return int(row["c"]) if row else 0
+
+    # ---------- пакетные операции: проверки целиком, запись одной транзакцией ----------
+
+    async def _existing_ids(self, ids: list[int]) -> set[int]:
+        found: set[int] = set()
+        for i in range(0, len(ids), _ID_CHUNK):
+            chunk = ids[i : i + _ID_CHUNK]
+            rows = await self.db.fetchall(_existing_ids_sql(len(chunk)), tuple(chunk))
+            found.update(int(r["instructor_id"]) for r in rows)
+        return found
+
+    async def _duplicate_ords(self, rows: list[tuple[int, int, Instructor]]) -> set[int]:
+        found: set[int] = set()
+        for i in range(0, len(rows), _BATCH_CHUNK):
+            chunk = rows[i : i + _BATCH_CHUNK]
+            found.update(
+                int(r["ord"])
+                for r in await self.db.fetchall(_dup_ords_sql(len(chunk)), _batch_params(chunk))
+            )
+        return found
+
+    async def _check_add(self, items: list[Instructor]) -> list[BatchItemResult]:
+        rows = [(i, x.instructor_id, x) for i, x in enumerate(items) if _valid_id(x.instructor_id)]
+        existing = await self._existing_ids([iid for _, iid, _ in rows])
+        return _add_results(items, existing, await self._duplicate_ords(rows))
+
+    async def _check_replace(self, items: list[tuple[int, Instructor]]) -> list[BatchItemResult]:
+        existing = await self._existing_ids([iid for iid, _ in items])
+        dups = await self._duplicate_ords([(i, iid, x) for i, (iid, x) in enumerate(items)])
+        return _replace_results(items, existing, dups)
+
+    # проверки и вставка - в одной транзакции, по запросу на пачку
+    async def add_many(self, items: list[Instructor]) -> BatchResult:
+        try:
+            async with self.db.transaction():
+                results = await self._check_add(items)
+                if any(not r.ok for r in results):
+                    return BatchResult(False, results)
+                for i in range(0, len(items), _BATCH_CHUNK):
+                    chunk = items[i : i + _BATCH_CHUNK]
+                    try:
+                        await self.db.execute(_insert_many_sql(len(chunk)), _insert_params(chunk))
+                    except UniqueViolation as e:
+                        if e.constraint not in (FIO_EXP_INDEX, "instructors_pkey"):
+                            raise
+                        raise _BatchRollback() from e
+        except _BatchRollback:
+            # id или ФИО+стаж заняла параллельная запись - причину ищем повторной проверкой
+            return BatchResult(False, _mark_race(await self._check_add(items)))
+        return BatchResult(True, results)
+
+    async def replace_many(self, items: list[tuple[int, Instructor]]) -> BatchResult:
+        try:
+            async with self.db.transaction():
+                results = await self._check_replace(items)
+                if any(not r.ok for r in results):
+                    return BatchResult(False, results)
+                updated = 0
+                for i in range(0, len(items), _BATCH_CHUNK):
+                    chunk = [
+                        (o, iid, x) for o, (iid, x) in enumerate(items[i : i + _BATCH_CHUNK], i)
+                    ]
+                    try:
+                        updated += await self.db.execute(
+                            _update_many_sql(len(chunk)), _batch_params(chunk)
+                        )
+                    except UniqueViolation as e:
+                        if e.constraint != FIO_EXP_INDEX:
+                            raise
+                        raise _BatchRollback() from e
+                if updated < len(items):
+                    # строки успели удалить между проверкой и обновлением
+                    ids = [iid for iid, _ in items]
+                    raise _BatchRollback(set(ids) - await self._existing_ids(ids))
+        except _BatchRollback as e:
+            if e.args and e.args[0]:
+                return BatchResult(False, _mark_gone(results, e.args[0]))
+            return BatchResult(False, _mark_race(await self._check_replace(items)))
+        return BatchResult(True, results)
+
+    async def delete_many(self, instructor_ids: list[int]) -> BatchResult:
+        results: list[BatchItemResult] = []
+        existing = await self._existing_ids(list(instructor_ids))
+        seen: set[int] = set()
+        for i, iid in enumerate(instructor_ids):
+            if iid not in existing:
+                err = "instructor_id не найден"
+            elif iid in seen:
+                err = "повтор id в пакете"
+            else:
+                err = None
+            results.append(BatchItemResult(i, err is None, iid, err))
+            seen.add(iid)
+        if any(not r.ok for r in results):
+            return BatchResult(False, results)
+
+        try:
+            async with self.db.transaction():
+                for iid in instructor_ids:
+                    if await self.db.execute(_DELETE_SQL, (iid,)) == 0:
+                        raise _BatchRollback({iid})
+        except _BatchRollback as e:
+            return BatchResult(False, _mark_gone(results, e.args[0]))
+        return BatchResult(True, results)
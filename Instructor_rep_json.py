@@ -1,14 +1,24 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
 import json
 import os
+import re
 
 from Instructor_rep_base import InstructorRepBase
 
+_CHUNK = 1 << 16
+_WS = re.compile(r"\s*")
+
+
+def _skip_ws(buf: str, pos: int) -> int:
+    m = _WS.match(buf, pos)
+    return m.end() if m else pos
+
 
 class InstructorRepJson(InstructorRepBase):
-    def __init__(self, path: str):
-        super().__init__(path)
+    def __init__(self, path: str, cached: bool = False):
+        super().__init__(path, cached=cached)
         if not os.path.exists(self.path):
             with open(self.path, "w", encoding="utf-8") as f:
                 json.dump([], f, ensure_ascii=False, indent=2)
@@ -22,6 +32,64 @@ class InstructorRepJson(InstructorRepBase):
             raise ValueError("Формат JSON: ожидается список объектов")
         return data
 
+    # потоковый разбор массива верхнего уровня: читаем файл блоками и
+    # отдаём объекты по одному, не загружая остальную часть файла
+    def _iter_raw(self) -> Iterator[dict]:
+        decoder = json.JSONDecoder()
+        with open(self.path, encoding="utf-8") as f:
+            buf, pos, eof = "", 0, False
+            opened = need_comma = after_comma = False
+            while True:
+                pos = _skip_ws(buf, pos)
+                if pos == len(buf):
+                    if eof:
+                        if not opened:
+                            yield from self._load_raw()
+                            return
+                        raise json.JSONDecodeError("Незавершённый JSON-массив", buf, pos)
+                    chunk = f.read(_CHUNK)
+                    eof = chunk == ""
+                    buf = buf[pos:] + chunk
+                    pos = 0
+                    continue
+                if not opened:
+                    if buf[pos] != "[":
+                        # не массив (null, мусор) - обычный путь со своими ошибками
+                        yield from self._load_raw()
+                        return
+                    opened = True
+                    pos += 1
+                    continue
+                if need_comma:
+                    if buf[pos] == "]":
+                        return
+                    if buf[pos] != ",":
+                        raise json.JSONDecodeError("Ожидалась ','", buf, pos)
+                    need_comma = False
+                    after_comma = True
+                    pos += 1
+                    continue
+                if buf[pos] == "]" and not after_comma:
+                    return
+                try:
+                    obj, end = decoder.raw_decode(buf, pos)
+                    complete = end < len(buf) or eof
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    complete = False
+                if not complete:
+                    # объект обрезан границей блока - дочитываем и разбираем заново
+                    chunk = f.read(_CHUNK)
+                    eof = chunk == ""
+                    buf = buf[pos:] + chunk
+                    pos = 0
+                    continue
+                yield obj
+                pos = end
+                need_comma = True
+                after_comma = False
+
     def _save_raw(self, data: list[dict]) -> None:
         with open(self.path, "w", encoding="utf-8") as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
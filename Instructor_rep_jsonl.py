@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import cast
+
+from Instructor_rep_base import InstructorRepBase
+
+
+# журнал операций в формате JSON Lines:
+#   {"op": "put", "row": {...}}          - добавить/заменить запись
+#   {"op": "del", "instructor_id": 5}    - удалить запись
+# каждая мутация дописывает строки в конец файла, состояние восстанавливается
+# проигрыванием журнала, а compaction переписывает файл снимком только из put
+class InstructorRepJsonl(InstructorRepBase):
+    def __init__(
+        self,
+        path: str,
+        cached: bool = True,
+        compact_ratio: float = 2.0,
+        compact_min_ops: int = 1000,
+    ):
+        super().__init__(path, cached=cached)
+        # сжимаем журнал, когда в нём в compact_ratio раз больше строк, чем живых записей
+        self.compact_ratio = compact_ratio
+        self.compact_min_ops = compact_min_ops
+        self._ops = 0
+        self._torn_tail = False
+        if not os.path.exists(self.path):
+            open(self.path, "w", encoding="utf-8").close()
+        if self.cached:
+            self._rows()
+
+    def _load_raw(self) -> list[dict]:
+        state: dict[int, dict] = {}
+        ops = 0
+        torn = False
+        with open(self.path, encoding="utf-8") as f:
+            lines = f.readlines()
+        for lineno, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            # последняя строка без "\n" - оборванная, даже если разбирается: иначе следующий
+            # append приклеится к ней; при следующем сохранении файл будет переписан
+            if lineno == len(lines) and not line.endswith("\n"):
+                torn = True
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                # недописанная последняя строка (сбой во время append) - игнорируем
+                if torn:
+                    break
+                raise ValueError(f"Формат JSONL: битая строка {lineno}") from None
+            op = rec.get("op") if isinstance(rec, dict) else None
+            if op == "put" and isinstance(rec.get("row"), dict):
+                row = cast(dict, rec["row"])
+                iid = self._record_id(row)
+                if iid is None:
+                    raise ValueError(f"Формат JSONL: нет instructor_id в строке {lineno}")
+                state[iid] = row
+            elif op == "del":
+                iid = self._record_id(rec)
+                if iid is None:
+                    raise ValueError(f"Формат JSONL: нет instructor_id в строке {lineno}")
+                state.pop(iid, None)
+            else:
+                raise ValueError(f"Формат JSONL: неизвестная операция в строке {lineno}")
+            ops += 1
+        self._ops = ops
+        self._torn_tail = torn
+        return list(state.values())
+
+    # instructor_id записи журнала; None, если его нет или это не целое число
+    @classmethod
+    def _record_id(cls, rec: dict) -> int | None:
+        try:
+            return cls._row_id(rec)
+        except (TypeError, ValueError):
+            return None
+
+    # compaction: атомарно переписываем журнал снимком текущего состояния
+    def _save_raw(self, data: list[dict]) -> None:
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for row in data:
+                f.write(self._dump({"op": "put", "row": row}))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._ops = len(data)
+        self._torn_tail = False
+
+    def _save_changes(self, data: list[dict], put: list[dict], deleted: list[int]) -> None:
+        # после оборванной строки дописывать нельзя - сначала переписываем файл
+        if self._torn_tail:
+            self._save_raw(data)
+            return
+        lines = [self._dump({"op": "put", "row": r}) for r in put]
+        lines += [self._dump({"op": "del", "instructor_id": i}) for i in deleted]
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+        self._ops += len(lines)
+        if self._ops >= self.compact_min_ops and self._ops > self.compact_ratio * len(data):
+            self._save_raw(data)
+
+    @staticmethod
+    def _dump(rec: dict) -> str:
+        return json.dumps(rec, ensure_ascii=False) + "\n"
+
+    # принудительное сжатие журнала
+    def compact(self) -> None:
+        self._persist(self._rows())
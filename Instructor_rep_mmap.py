@@ -0,0 +1,423 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+import mmap
+import os
+import struct
+
+from Instructor import Instructor
+from instructor_repo_iface import BatchItemResult, BatchResult
+from PublicInstructorProfile import PublicInstructorProfile
+from trigram_index import TrigramIndex
+
+_DUP_ERROR = "такой Instructor уже существует (равенство по ФИО+стаж)"
+
+# файл записей: заголовок + слоты фиксированной ширины, слот = instructor_id - 1
+#   заголовок: magic, занято слотов, живых записей
+#   запись: флаг, стаж, длина телефона, id, смещения фамилии/имени/отчества в куче, телефон
+_HEADER = struct.Struct("<8sII")
+_RECORD = struct.Struct("<BBHIIII32s")
+_MAGIC = b"INSTRMM1"
+# куча строк (отдельный файл): занятый размер + записи вида <длина u16><utf-8>
+_HEAP_HEADER = struct.Struct("<Q")
+_LEN = struct.Struct("<H")
+
+_LIVE = 1
+_NONE = 0xFFFFFFFF
+_INITIAL_SLOTS = 64
+_INITIAL_HEAP = 4096
+
+
+class InstructorRepMmap:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.heap_path = f"{path}.heap"
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if not os.path.exists(self.path):
+            with open(self.path, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, 0, 0))
+                f.truncate(_HEADER.size + _INITIAL_SLOTS * _RECORD.size)
+            with open(self.heap_path, "wb") as f:
+                f.write(_HEAP_HEADER.pack(_HEAP_HEADER.size))
+                f.truncate(_INITIAL_HEAP)
+        self._f = open(self.path, "r+b")
+        self._hf = open(self.heap_path, "r+b")
+        self._mm = mmap.mmap(self._f.fileno(), 0)
+        self._heap = mmap.mmap(self._hf.fileno(), 0)
+        magic, self._slots, self._live = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            raise ValueError("Формат mmap-хранилища: неверная сигнатура файла")
+        (self._heap_used,) = _HEAP_HEADER.unpack_from(self._heap, 0)
+        # строятся лениво: номера живых слотов (нужны только при наличии удалённых)
+        # и ключи равенства ФИО+стаж для проверки дублей
+        self._live_slots: array | None = None
+        self._keys: dict[tuple, int] | None = None
+        # триграммы фамилий для search(), тоже лениво
+        self._trgm: TrigramIndex | None = None
+        # счётчик записей (для state_token)
+        self._writes = 0
+
+    def close(self) -> None:
+        if self._mm.closed:
+            return
+        self._mm.flush()
+        self._heap.flush()
+        self._mm.close()
+        self._heap.close()
+        self._f.close()
+        self._hf.close()
+
+    def flush(self) -> None:
+        self._mm.flush()
+        self._heap.flush()
+
+    # отпечаток состояния для внешних кэшей: файл меняется только через этот объект
+    def state_token(self) -> tuple:
+        return (self._writes,)
+
+    # ---------- низкоуровневый доступ ----------
+
+    def _capacity(self) -> int:
+        return (len(self._mm) - _HEADER.size) // _RECORD.size
+
+    def _offset(self, slot: int) -> int:
+        return _HEADER.size + slot * _RECORD.size
+
+    def _write_header(self) -> None:
+        self._writes += 1
+        _HEADER.pack_into(self._mm, 0, _MAGIC, self._slots, self._live)
+
+    def _grow_records(self) -> None:
+        new_cap = max(_INITIAL_SLOTS, self._capacity() * 2)
+        self._mm.flush()
+        self._mm.close()
+        self._f.truncate(_HEADER.size + new_cap * _RECORD.size)
+        self._mm = mmap.mmap(self._f.fileno(), 0)
+
+    def _read_str(self, off: int) -> str | None:
+        if off == _NONE:
+            return None
+        (n,) = _LEN.unpack_from(self._heap, off)
+        return self._heap[off + _LEN.size : off + _LEN.size + n].decode("utf-8")
+
+    def _write_str(self, value: str | None) -> int:
+        if value is None:
+            return _NONE
+        data = value.encode("utf-8")
+        if len(data) > 0xFFFF:
+            raise ValueError("строка слишком длинная для mmap-хранилища")
+        need = _LEN.size + len(data)
+        if self._heap_used + need > len(self._heap):
+            new_size = max(len(self._heap) * 2, self._heap_used + need)
+            self._heap.flush()
+            self._heap.close()
+            self._hf.truncate(new_size)
+            self._heap = mmap.mmap(self._hf.fileno(), 0)
+        off = self._heap_used
+        _LEN.pack_into(self._heap, off, len(data))
+        self._heap[off + _LEN.size : off + need] = data
+        self._heap_used += need
+        _HEAP_HEADER.pack_into(self._heap, 0, self._heap_used)
+        return int(off)
+
+    def _read(self, slot: int) -> Instructor | None:
+        flags, exp, phone_len, iid, o_last, o_first, o_patr, phone = _RECORD.unpack_from(
+            self._mm, self._offset(slot)
+        )
+        if flags != _LIVE:
+            return None
+        # записи пишутся только из проверенных Instructor - повторно не валидируем
+        return Instructor.from_validated_row(
+            {
+                "instructor_id": iid,
+                "last_name": self._read_str(o_last),
+                "first_name": self._read_str(o_first),
+                "patronymic": self._read_str(o_patr),
+                "phone": phone[:phone_len].decode("utf-8"),
+                "experience_years": exp,
+            }
+        )
+
+    def _write(self, slot: int, item: Instructor) -> None:
+        self._writes += 1
+        phone = item.phone.encode("utf-8")
+        if len(phone) > 32:
+            raise ValueError("phone слишком длинный для mmap-хранилища (максимум 32 байта)")
+        _RECORD.pack_into(
+            self._mm,
+            self._offset(slot),
+            _LIVE,
+            item.experience_years,
+            len(phone),
+            item.instructor_id,
+            self._write_str(item.last_name),
+            self._write_str(item.first_name),
+            self._write_str(item.patronymic),
+            phone,
+        )
+        if self._trgm is not None:
+            self._trgm.add(item.instructor_id, item.last_name)
+
+    def _is_live(self, slot: int) -> bool:
+        return self._mm[self._offset(slot)] == _LIVE
+
+    def _slot_of(self, instructor_id: int) -> int | None:
+        slot = instructor_id - 1
+        if 0 <= slot < self._slots and self._is_live(slot):
+            return slot
+        return None
+
+    def _live_index(self) -> array | None:
+        # пока удалений нет, k-я живая запись лежит прямо в слоте k
+        if self._live == self._slots:
+            return None
+        if self._live_slots is None:
+            self._live_slots = array("I", (s for s in range(self._slots) if self._is_live(s)))
+        return self._live_slots
+
+    @staticmethod
+    def _eq_key(ins: Instructor) -> tuple:
+        return (ins.last_name, ins.first_name, ins.patronymic, ins.experience_years)
+
+    def _key_index(self) -> dict[tuple, int]:
+        if self._keys is None:
+            keys: dict[tuple, int] = {}
+            for slot in range(self._slots):
+                x = self._read(slot)
+                if x is not None:
+                    key = self._eq_key(x)
+                    keys[key] = keys.get(key, 0) + 1
+            self._keys = keys
+        return self._keys
+
+    def _iter_live(self) -> list[Instructor]:
+        items = []
+        for slot in range(self._slots):
+            x = self._read(slot)
+            if x is not None:
+                items.append(x)
+        return items
+
+    def _trgm_index(self) -> TrigramIndex:
+        if self._trgm is None:
+            index = TrigramIndex()
+            for x in self._iter_live():
+                index.add(x.instructor_id, x.last_name)
+            self._trgm = index
+        return self._trgm
+
+    # ---------- InstructorRepo ----------
+
+    def get_by_id(self, instructor_id: int) -> Instructor | None:
+        slot = self._slot_of(instructor_id)
+        return None if slot is None else self._read(slot)
+
+    def get_k_n_short_list(self, k: int, n: int) -> list[PublicInstructorProfile]:
+        if k <= 0 or n <= 0:
+            return []
+        start = (k - 1) * n
+        end = min(start + n, self._live)
+        live = self._live_index()
+        slots = range(start, end) if live is None else live[start:end]
+        result = []
+        for slot in slots:
+            x = self._read(slot)
+            if x is not None:
+                result.append(PublicInstructorProfile.from_instructor(x))
+        return result
+
+    def sort_by_last_name(self, reverse: bool = False) -> list[Instructor]:
+        # порядок слотов задаётся id, поэтому файл не переписываем - только сортируем выборку
+        items = self._iter_live()
+        items.sort(
+            key=lambda x: (
+                (x.last_name or "").lower(),
+                (x.first_name or "").lower(),
+                (x.patronymic or "").lower(),
+            ),
+            reverse=reverse,
+        )
+        return items
+
+    # автогенерация id: следующий свободный слот
+    def add(self, item: Instructor) -> Instructor:
+        keys = self._key_index()
+        key = self._eq_key(item)
+        if key in keys:
+            raise ValueError(_DUP_ERROR)
+        if self._slots >= self._capacity():
+            self._grow_records()
+        slot = self._slots
+        obj = Instructor(
+            slot + 1,
+            item.last_name,
+            item.first_name,
+            item.patronymic,
+            item.phone,
+            item.experience_years,
+        )
+        self._write(slot, obj)
+        self._slots += 1
+        self._live += 1
+        self._write_header()
+        if self._live_slots is not None:
+            self._live_slots.append(slot)
+        keys[key] = 1
+        return obj
+
+    def replace_by_id(self, instructor_id: int, new_item: Instructor) -> bool:
+        slot = self._slot_of(instructor_id)
+        if slot is None:
+            return False
+        old = self._read(slot)
+        keys = self._key_index()
+        old_key = self._eq_key(old) if old is not None else None
+        new_key = self._eq_key(new_item)
+        if keys.get(new_key, 0) > (1 if new_key == old_key else 0):
+            raise ValueError(_DUP_ERROR)
+        obj = Instructor(
+            instructor_id,
+            new_item.last_name,
+            new_item.first_name,
+            new_item.patronymic,
+            new_item.phone,
+            new_item.experience_years,
+        )
+        self._write(slot, obj)
+        if old_key is not None:
+            self._key_discard(keys, old_key)
+        keys[new_key] = keys.get(new_key, 0) + 1
+        return True
+
+    def delete_by_id(self, instructor_id: int) -> bool:
+        slot = self._slot_of(instructor_id)
+        if slot is None:
+            return False
+        if self._keys is not None:
+            old = self._read(slot)
+            if old is not None:
+                self._key_discard(self._keys, self._eq_key(old))
+        live = self._live_index()
+        # надгробие: слот остаётся, строки в куче не освобождаются
+        self._mm[self._offset(slot)] = 0
+        if self._trgm is not None:
+            self._trgm.remove(instructor_id)
+        self._live -= 1
+        self._write_header()
+        if live is not None:
+            i = bisect_left(live, slot)
+            if i < len(live) and live[i] == slot:
+                del live[i]
+        else:
+            # первое удаление: до него все слоты были живыми
+            self._live_slots = array("I", range(self._slots))
+            del self._live_slots[slot]
+        return True
+
+    @staticmethod
+    def _key_discard(keys: dict[tuple, int], key: tuple) -> None:
+        left = keys.get(key, 0) - 1
+        if left > 0:
+            keys[key] = left
+        else:
+            keys.pop(key, None)
+
+    def get_count(self) -> int:
+        return int(self._live)
+
+    # нечёткий поиск по фамилии - лучшие limit по сходству триграмм
+    def search(self, text: str, limit: int = 20) -> list[PublicInstructorProfile]:
+        result = []
+        for iid, _ in self._trgm_index().search(text, limit):
+            x = self.get_by_id(iid)
+            if x is not None:
+                result.append(PublicInstructorProfile.from_instructor(x))
+        return result
+
+    # ---------- пакетные операции: сначала проверяем весь пакет, потом пишем ----------
+
+    def _check_phone(self, item: Instructor) -> str | None:
+        if len(item.phone.encode("utf-8")) > 32:
+            return "phone слишком длинный для mmap-хранилища (максимум 32 байта)"
+        return None
+
+    def add_many(self, items: list[Instructor]) -> BatchResult:
+        keys = self._key_index()
+        results: list[BatchItemResult] = []
+        batch_keys: set[tuple] = set()
+        for i, item in enumerate(items):
+            key = self._eq_key(item)
+            err = _DUP_ERROR if key in keys or key in batch_keys else self._check_phone(item)
+            new_id = self._slots + len(batch_keys) + 1
+            results.append(BatchItemResult(i, err is None, None if err else new_id, err))
+            if err is None:
+                batch_keys.add(key)
+        if len(batch_keys) != len(items):
+            return BatchResult(False, results)
+        for item in items:
+            self.add(item)
+        return BatchResult(True, results)
+
+    def replace_many(self, items: list[tuple[int, Instructor]]) -> BatchResult:
+        keys = self._key_index()
+        results: list[BatchItemResult] = []
+        delta: dict[tuple, int] = {}
+        seen: set[int] = set()
+        for i, (iid, new_item) in enumerate(items):
+            slot = self._slot_of(iid)
+            old = None if slot is None else self._read(slot)
+            if old is None:
+                err: str | None = "instructor_id не найден"
+            elif iid in seen:
+                err = "повтор id в пакете"
+            else:
+                err = self._check_phone(new_item)
+            results.append(BatchItemResult(i, err is None, iid, err))
+            seen.add(iid)
+            if err is None and old is not None:
+                delta[self._eq_key(old)] = delta.get(self._eq_key(old), 0) - 1
+                delta[self._eq_key(new_item)] = delta.get(self._eq_key(new_item), 0) + 1
+        clashes = {k for k, d in delta.items() if d > 0 and keys.get(k, 0) + d > 1}
+        for i, (iid, new_item) in enumerate(items):
+            if results[i].ok and self._eq_key(new_item) in clashes:
+                results[i] = BatchItemResult(i, False, iid, _DUP_ERROR)
+        if any(not r.ok for r in results):
+            return BatchResult(False, results)
+        for iid, new_item in items:
+            slot = self._slot_of(iid)
+            if slot is not None:
+                obj = Instructor(
+                    iid,
+                    new_item.last_name,
+                    new_item.first_name,
+                    new_item.patronymic,
+                    new_item.phone,
+                    new_item.experience_years,
+                )
+                self._write(slot, obj)
+        for k, d in delta.items():
+            left = keys.get(k, 0) + d
+            if left > 0:
+                keys[k] = left
+            else:
+                keys.pop(k, None)
+        return BatchResult(True, results)
+
+    def delete_many(self, instructor_ids: list[int]) -> BatchResult:
+        results: list[BatchItemResult] = []
+        seen: set[int] = set()
+        for i, iid in enumerate(instructor_ids):
+            if iid in seen:
+                err: str | None = "повтор id в пакете"
+            elif self._slot_of(iid) is None:
+                err = "instructor_id не найден"
+            else:
+                err = None
+            results.append(BatchItemResult(i, err is None, iid, err))
+            seen.add(iid)
+        if any(not r.ok for r in results):
+            return BatchResult(False, results)
+        for iid in instructor_ids:
+            self.delete_by_id(iid)
+        return BatchResult(True, results)
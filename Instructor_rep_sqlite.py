@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from Instructor_rep_db import _STAGE_COLUMNS, _STAGE_DDL, InstructorRepDB
+from sqlite_db import SqliteDB
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS instructors (
+    instructor_id    INTEGER PRIMARY KEY,
+    last_name        TEXT    NOT NULL,
+    first_name       TEXT    NOT NULL,
+    patronymic       TEXT,
+    phone            TEXT    NOT NULL,
+    experience_years INTEGER NOT NULL
+);
+-- правило равенства ФИО+стаж
+CREATE UNIQUE INDEX IF NOT EXISTS instructors_fio_exp_uniq
+    ON instructors (last_name, first_name, COALESCE(patronymic, ''), experience_years);
+-- под ORDER BY last_name, first_name, patronymic, instructor_id в get_k_n_short_list
+CREATE INDEX IF NOT EXISTS instructors_fio_sort_idx
+    ON instructors (last_name, first_name, patronymic, instructor_id);
+"""
+
+
+# встраиваемый аналог InstructorRepDB: тот же SQL поверх SqliteDB
+class InstructorRepSqlite(InstructorRepDB):
+    def __init__(self, db: SqliteDB) -> None:
+        # SqliteDB повторяет интерфейс PostgresDB (execute/fetchone/fetchall)
+        self.db = db  # type: ignore[assignment]
+        self._sqlite = db
+        db.executescript(_SCHEMA)
+        # индекс ФИО+стаж создаётся схемой выше
+        self._schema_checked = True
+        # pg_trgm нет: search() считает сходство в Python
+        self._has_pg_trgm = False
+
+    def close(self) -> None:
+        self.db.close()
+
+    # COPY в SQLite нет: staging заполняем пакетным executemany
+    def _create_stage(self) -> None:
+        self.db.execute("DROP TABLE IF EXISTS temp.instructors_stage")
+        self.db.execute(f"CREATE TEMP TABLE instructors_stage ({_STAGE_DDL})")
+
+    def _fill_stage(self, rows: list[tuple]) -> None:
+        marks = ", ".join(["%s"] * 7)
+        self._sqlite.executemany(
+            f"INSERT INTO instructors_stage ({_STAGE_COLUMNS}) VALUES ({marks})", rows
+        )
@@ -1,23 +1,37 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import os
-from typing import cast
+from typing import Any, cast
 
 import yaml  # type: ignore[import-untyped]
 
 from Instructor_rep_base import InstructorRepBase
 
+# C-реализация libyaml, если PyYAML собран с ней; иначе чистый Python
+try:
+    from yaml import CSafeDumper as _FastDumper, CSafeLoader as _FastLoader
+except ImportError:
+    from yaml import SafeDumper as _FastDumper, SafeLoader as _FastLoader
+
 
 class InstructorRepYaml(InstructorRepBase):
-    def __init__(self, path: str):
-        super().__init__(path)
+    def __init__(self, path: str, cached: bool = False, fast: bool = False):
+        super().__init__(path, cached=cached)
+        # быстрый режим: libyaml + файл-спутник с уже разобранным документом
+        self.fast = fast
+        self.sidecar_path = f"{self.path}.cache.json"
         if not os.path.exists(self.path):
             with open(self.path, "w", encoding="utf-8") as f:
                 yaml.safe_dump([], f, allow_unicode=True, sort_keys=False, indent=2)
 
     def _load_raw(self) -> list[dict]:
-        with open(self.path, encoding="utf-8") as f:
-            data = cast(list[dict] | None, yaml.safe_load(f))
+        if self.fast:
+            data = self._load_fast()
+        else:
+            with open(self.path, encoding="utf-8") as f:
+                data = cast(list[dict] | None, yaml.safe_load(f))
         if data is None:
             return []
         if not isinstance(data, list):
@@ -25,5 +39,41 @@ class InstructorRepYaml(InstructorRepBase):
         return data
 
     def _save_raw(self, data: list[dict]) -> None:
+        if self.fast:
+            text = yaml.dump(
+                data, Dumper=_FastDumper, allow_unicode=True, sort_keys=False, indent=2
+            )
+            raw = text.encode("utf-8")
+            with open(self.path, "wb") as f:
+                f.write(raw)
+            self._write_sidecar(hashlib.sha256(raw).hexdigest(), data)
+            return
         with open(self.path, "w", encoding="utf-8") as f:
             yaml.safe_dump(data, f, allow_unicode=True, sort_keys=False, indent=2)
+
+    # документ не разбираем, если хэш содержимого совпал с сохранённым в спутнике
+    def _load_fast(self) -> Any:
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        try:
+            with open(self.sidecar_path, encoding="utf-8") as f:
+                cached = json.load(f)
+            if isinstance(cached, dict) and cached.get("sha256") == digest:
+                return cached.get("rows")
+        except (OSError, ValueError):
+            pass
+        data = yaml.load(raw.decode("utf-8"), Loader=_FastLoader)
+        self._write_sidecar(digest, data)
+        return data
+
+    def _write_sidecar(self, digest: str, data: Any) -> None:
+        tmp = f"{self.sidecar_path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"sha256": digest, "rows": data}, f, ensure_ascii=False)
+            os.replace(tmp, self.sidecar_path)
+        except (OSError, TypeError, ValueError):
+            # не JSON-совместимые значения (даты и т.п.) - просто работаем без спутника
+            if os.path.exists(tmp):
+                os.remove(tmp)
@@ -5,6 +5,8 @@ from Instructor import Instructor
 
 
 class PublicInstructorProfile(Instructor):
+    __slots__ = ("__contact_override",)
+
     def __init__(
         self,
         instructor_id: int | str | dict | Instructor,
@@ -65,6 +67,29 @@ class PublicInstructorProfile(Instructor):
         super().__init__(instructor_id, last_name, first_name, patronymic, phone, experience_years)
         self.__contact_override = contact_override
 
+    @classmethod
+    def from_validated_row(cls, row: dict) -> "PublicInstructorProfile":
+        obj = cast(PublicInstructorProfile, super().from_validated_row(row))
+        obj.__contact_override = row.get("contact_override")
+        return obj
+
+    # профиль из уже построенного (значит, проверенного) Instructor без повторной валидации
+    @classmethod
+    def from_instructor(
+        cls, instr: Instructor, contact_override: str | None = None
+    ) -> "PublicInstructorProfile":
+        return cls.from_validated_row(
+            {
+                "instructor_id": instr.instructor_id,
+                "last_name": instr.last_name,
+                "first_name": instr.first_name,
+                "patronymic": instr.patronymic,
+                "phone": instr.phone,
+                "experience_years": instr.experience_years,
+                "contact_override": contact_override,
+            }
+        )
+
     @property
     def contact(self) -> str:
         return self.__contact_override if self.__contact_override else self.phone
@@ -1,17 +1,29 @@
 from __future__ import annotations
 
+from collections.abc import Iterable, Iterator
+from typing import Any
+
 from db_singleton import PostgresDB
+from filter_spec import Condition
 from Instructor import Instructor
 from Instructor_rep_db import InstructorRepDB
 from Instructor_rep_json import InstructorRepJson
+from Instructor_rep_jsonl import InstructorRepJsonl
+from Instructor_rep_mmap import InstructorRepMmap
+from Instructor_rep_sqlite import InstructorRepSqlite
 from Instructor_rep_yaml import InstructorRepYaml
-from instructor_repo_iface import InstructorRepo
+from instructor_repo_iface import (
+    BatchResult,
+    BulkLoadReport,
+    InstructorRepo,
+)
 from PublicInstructorProfile import PublicInstructorProfile
+from sqlite_db import SqliteDB
 
 
 class JsonRepoAdapter(InstructorRepo):
-    def __init__(self, path: str):
-        self._adaptee = InstructorRepJson(path)
+    def __init__(self, path: str, cached: bool = False):
+        self._adaptee = InstructorRepJson(path, cached=cached)
 
     def get_by_id(self, instructor_id: int) -> Instructor | None:
         return self._adaptee.get_by_id(instructor_id)
@@ -31,13 +43,119 @@ class JsonRepoAdapter(InstructorRepo):
     def get_count(self) -> int:
         return self._adaptee.get_count()
 
+    def search(self, text: str, limit: int = 20) -> list[PublicInstructorProfile]:
+        return self._adaptee.search(text, limit)
+
+    def state_token(self) -> tuple:
+        return self._adaptee.state_token()
+
+    def find_candidates(self, conditions: Iterable[Condition]) -> list[Instructor] | None:
+        return self._adaptee.find_candidates(conditions)
+
     def sort_by_last_name(self, reverse: bool = False) -> list[Instructor]:
         return self._adaptee.sort_by_last_name(reverse=reverse)
 
+    def add_many(self, items: list[Instructor]) -> BatchResult:
+        return self._adaptee.add_many(items)
+
+    def replace_many(self, items: list[tuple[int, Instructor]]) -> BatchResult:
+        return self._adaptee.replace_many(items)
+
+    def delete_many(self, instructor_ids: list[int]) -> BatchResult:
+        return self._adaptee.delete_many(instructor_ids)
+
 
 class YamlRepoAdapter(InstructorRepo):
+    def __init__(self, path: str, cached: bool = False, fast: bool = False):
+        self._adaptee = InstructorRepYaml(path, cached=cached, fast=fast)
+
+    def get_by_id(self, instructor_id: int) -> Instructor | None:
+        return self._adaptee.get_by_id(instructor_id)
+
+    def get_k_n_short_list(self, k: int, n: int) -> list[PublicInstructorProfile]:
+        return self._adaptee.get_k_n_short_list(k, n)
+
+    def add(self, item: Instructor) -> Instructor:
+        return self._adaptee.add(item)
+
+    def replace_by_id(self, instructor_id: int, new_item: Instructor) -> bool:
+        return self._adaptee.replace_by_id(instructor_id, new_item)
+
+    def delete_by_id(self, instructor_id: int) -> bool:
+        return self._adaptee.delete_by_id(instructor_id)
+
+    def get_count(self) -> int:
+        return self._adaptee.get_count()
+
+    def search(self, text: str, limit: int = 20) -> list[PublicInstructorProfile]:
+        return self._adaptee.search(text, limit)
+
+    def state_token(self) -> tuple:
+        return self._adaptee.state_token()
+
+    def find_candidates(self, conditions: Iterable[Condition]) -> list[Instructor] | None:
+        return self._adaptee.find_candidates(conditions)
+
+    def sort_by_last_name(self, reverse: bool = False) -> list[Instructor]:
+        return self._adaptee.sort_by_last_name(reverse=reverse)
+
+    def add_many(self, items: list[Instructor]) -> BatchResult:
+        return self._adaptee.add_many(items)
+
+    def replace_many(self, items: list[tuple[int, Instructor]]) -> BatchResult:
+        return self._adaptee.replace_many(items)
+
+    def delete_many(self, instructor_ids: list[int]) -> BatchResult:
+        return self._adaptee.delete_many(instructor_ids)
+
+
+class JsonlRepoAdapter(InstructorRepo):
+    def __init__(self, path: str, cached: bool = True):
+        self._adaptee = InstructorRepJsonl(path, cached=cached)
+
+    def get_by_id(self, instructor_id: int) -> Instructor | None:
+        return self._adaptee.get_by_id(instructor_id)
+
+    def get_k_n_short_list(self, k: int, n: int) -> list[PublicInstructorProfile]:
+        return self._adaptee.get_k_n_short_list(k, n)
+
+    def add(self, item: Instructor) -> Instructor:
+        return self._adaptee.add(item)
+
+    def replace_by_id(self, instructor_id: int, new_item: Instructor) -> bool:
+        return self._adaptee.replace_by_id(instructor_id, new_item)
+
+    def delete_by_id(self, instructor_id: int) -> bool:
+        return self._adaptee.delete_by_id(instructor_id)
+
+    def get_count(self) -> int:
+        return self._adaptee.get_count()
+
+    def search(self, text: str, limit: int = 20) -> list[PublicInstructorProfile]:
+        return self._adaptee.search(text, limit)
+
+    def state_token(self) -> tuple:
+        return self._adaptee.state_token()
+
+    def find_candidates(self, conditions: Iterable[Condition]) -> list[Instructor] | None:
+        return self._adaptee.find_candidates(conditions)
+
+    def sort_by_last_name(self, reverse: bool = False) -> list[Instructor]:
+        return self._adaptee.sort_by_last_name(reverse=reverse)
+
+    def add_many(self, items: list[Instructor]) -> BatchResult:
+        return self._adaptee.add_many(items)
+
+    def replace_many(self, items: list[tuple[int, Instructor]]) -> BatchResult:
+        return self._adaptee.replace_many(items)
+
+    def delete_many(self, instructor_ids: list[int]) -> BatchResult:
+        return self._adaptee.delete_many(instructor_ids)
+
+
+class MmapRepoAdapter(InstructorRepo):
     def __init__(self, path: str):
-        self._adaptee = InstructorRepYaml(path)
+        self._adaptee = InstructorRepMmap(path)
 
     def get_by_id(self, instructor_id: int) -> Instructor | None:
         return self._adaptee.get_by_id(instructor_id)
@@ -57,13 +175,48 @@ class YamlRepoAdapter(InstructorRepo):
     def get_count(self) -> int:
         return self._adaptee.get_count()
 
+    def search(self, text: str, limit: int = 20) -> list[PublicInstructorProfile]:
+        return self._adaptee.search(text, limit)
+
+    def state_token(self) -> tuple:
+        return self._adaptee.state_token()
+
     def sort_by_last_name(self, reverse: bool = False) -> list[Instructor]:
         return self._adaptee.sort_by_last_name(reverse=reverse)
 
+    def add_many(self, items: list[Instructor]) -> BatchResult:
+        return self._adaptee.add_many(items)
+
+    def replace_many(self, items: list[tuple[int, Instructor]]) -> BatchResult:
+        return self._adaptee.replace_many(items)
+
+    def delete_many(self, instructor_ids: list[int]) -> BatchResult:
+        return self._adaptee.delete_many(instructor_ids)
+
 
 class DbRepoAdapter(InstructorRepo):
-    def __init__(self, *, host: str, port: int, dbname: str, user: str, password: str):
-        db = PostgresDB(host=host, port=port, dbname=dbname, user=user, password=password)
+    def __init__(
+        self,
+        *,
+        host: str,
+        port: int,
+        dbname: str,
+        user: str,
+        password: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 30.0,
+    ):
+        db = PostgresDB(
+            host=host,
+            port=port,
+            dbname=dbname,
+            user=user,
+            password=password,
+            min_size=min_size,
+            max_size=max_size,
+            timeout=timeout,
+        )
         self._adaptee = InstructorRepDB(db)
 
     def get_by_id(self, instructor_id: int) -> Instructor | None:
@@ -72,6 +225,60 @@ class DbRepoAdapter(InstructorRepo):
     def get_k_n_short_list(self, k: int, n: int) -> list[PublicInstructorProfile]:
         return self._adaptee.get_k_n_short_list(k, n)
 
+    def get_keyset_page(
+        self, n: int, cursor: str | None = None
+    ) -> tuple[list[PublicInstructorProfile], str | None]:
+        return self._adaptee.get_keyset_page(n, cursor)
+
+    def add(self, item: Instructor) -> Instructor:
+        return self._adaptee.add(item)
+
+    def replace_by_id(self, instructor_id: int, new_item: Instructor) -> bool:
+        return self._adaptee.replace_by_id(instructor_id, new_item)
+
+    def delete_by_id(self, instructor_id: int) -> bool:
+        return self._adaptee.delete_by_id(instructor_id)
+
+    def get_count(self) -> int:
+        return self._adaptee.get_count()
+
+    def search(self, text: str, limit: int = 20) -> list[PublicInstructorProfile]:
+        return self._adaptee.search(text, limit)
+
+    def sort_by_last_name(self, reverse: bool = False) -> list[Instructor]:
+        return self._adaptee.sort_by_last_name(reverse=reverse)
+
+    def iter_all(self, batch_size: int = 1000, reverse: bool = False) -> Iterator[Instructor]:
+        return self._adaptee.iter_all(batch_size, reverse)
+
+    def add_many(self, items: list[Instructor]) -> BatchResult:
+        return self._adaptee.add_many(items)
+
+    def replace_many(self, items: list[tuple[int, Instructor]]) -> BatchResult:
+        return self._adaptee.replace_many(items)
+
+    def delete_many(self, instructor_ids: list[int]) -> BatchResult:
+        return self._adaptee.delete_many(instructor_ids)
+
+    def bulk_load(self, items: Iterable[Instructor | dict[str, Any]]) -> BulkLoadReport:
+        return self._adaptee.bulk_load(items)
+
+
+class SqliteRepoAdapter(InstructorRepo):
+    def __init__(self, path: str):
+        self._adaptee = InstructorRepSqlite(SqliteDB(path))
+
+    def get_by_id(self, instructor_id: int) -> Instructor | None:
+        return self._adaptee.get_by_id(instructor_id)
+
+    def get_k_n_short_list(self, k: int, n: int) -> list[PublicInstructorProfile]:
+        return self._adaptee.get_k_n_short_list(k, n)
+
+    def get_keyset_page(
+        self, n: int, cursor: str | None = None
+    ) -> tuple[list[PublicInstructorProfile], str | None]:
+        return self._adaptee.get_keyset_page(n, cursor)
+
     def add(self, item: Instructor) -> Instructor:
         return self._adaptee.add(item)
 
@@ -84,5 +291,23 @@ class DbRepoAdapter(InstructorRepo):
     def get_count(self) -> int:
         return self._adaptee.get_count()
 
+    def search(self, text: str, limit: int = 20) -> list[PublicInstructorProfile]:
+        return self._adaptee.search(text, limit)
+
     def sort_by_last_name(self, reverse: bool = False) -> list[Instructor]:
         return self._adaptee.sort_by_last_name(reverse=reverse)
+
+    def iter_all(self, batch_size: int = 1000, reverse: bool = False) -> Iterator[Instructor]:
+        return self._adaptee.iter_all(batch_size, reverse)
+
+    def add_many(self, items: list[Instructor]) -> BatchResult:
+        return self._adaptee.add_many(items)
+
+    def replace_many(self, items: list[tuple[int, Instructor]]) -> BatchResult:
+        return self._adaptee.replace_many(items)
+
+    def delete_many(self, instructor_ids: list[int]) -> BatchResult:
+        return self._adaptee.delete_many(instructor_ids)
+
+    def bulk_load(self, items: Iterable[Instructor | dict[str, Any]]) -> BulkLoadReport:
+        return self._adaptee.bulk_load(items)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+
+from async_db import AsyncPostgresDB
+from Instructor import Instructor
+from Instructor_rep_db_async import AsyncInstructorRepDB
+from instructor_repo_iface import AsyncInstructorRepo, BatchResult
+from PublicInstructorProfile import PublicInstructorProfile
+
+
+# отдельно от adapters.py: asyncpg нужен только тем, кто работает через asyncio
+class AsyncDbRepoAdapter(AsyncInstructorRepo):
+    def __init__(
+        self,
+        *,
+        host: str,
+        port: int,
+        dbname: str,
+        user: str,
+        password: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 30.0,
+    ):
+        db = AsyncPostgresDB(
+            host=host,
+            port=port,
+            dbname=dbname,
+            user=user,
+            password=password,
+            min_size=min_size,
+            max_size=max_size,
+            timeout=timeout,
+        )
+        self._adaptee = AsyncInstructorRepDB(db)
+
+    async def get_by_id(self, instructor_id: int) -> Instructor | None:
+        return await self._adaptee.get_by_id(instructor_id)
+
+    async def get_k_n_short_list(self, k: int, n: int) -> list[PublicInstructorProfile]:
+        return await self._adaptee.get_k_n_short_list(k, n)
+
+    async def get_keyset_page(
+        self, n: int, cursor: str | None = None
+    ) -> tuple[list[PublicInstructorProfile], str | None]:
+        return await self._adaptee.get_keyset_page(n, cursor)
+
+    async def add(self, item: Instructor) -> Instructor:
+        return await self._adaptee.add(item)
+
+    async def replace_by_id(self, instructor_id: int, new_item: Instructor) -> bool:
+        return await self._adaptee.replace_by_id(instructor_id, new_item)
+
+    async def delete_by_id(self, instructor_id: int) -> bool:
+        return await self._adaptee.delete_by_id(instructor_id)
+
+    async def get_count(self) -> int:
+        return await self._adaptee.get_count()
+
+    async def search(self, text: str, limit: int = 20) -> list[PublicInstructorProfile]:
+        return await self._adaptee.search(text, limit)
+
+    async def sort_by_last_name(self, reverse: bool = False) -> list[Instructor]:
+        return await self._adaptee.sort_by_last_name(reverse=reverse)
+
+    def iter_all(self, batch_size: int = 1000, reverse: bool = False) -> AsyncIterator[Instructor]:
+        return self._adaptee.iter_all(batch_size, reverse)
+
+    async def add_many(self, items: list[Instructor]) -> BatchResult:
+        return await self._adaptee.add_many(items)
+
+    async def replace_many(self, items: list[tuple[int, Instructor]]) -> BatchResult:
+        return await self._adaptee.replace_many(items)
+
+    async def delete_many(self, instructor_ids: list[int]) -> BatchResult:
+        return await self._adaptee.delete_many(instructor_ids)
+
+    async def close(self) -> None:
+        await self._adaptee.close()
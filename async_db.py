@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+import json
+import re
+from typing import Any
+
+import asyncpg
+
+from db_singleton import UniqueViolation
+
+# плейсхолдеры psycopg2 (%s, %%) -> asyncpg ($1, $2, ..., %)
+_PARAM_RE = re.compile(r"%%|%s")
+
+
+def _translate(sql: str) -> str:
+    n = 0
+
+    def repl(m: re.Match[str]) -> str:
+        nonlocal n
+        if m.group(0) == "%%":
+            return "%"
+        n += 1
+        return f"${n}"
+
+    return _PARAM_RE.sub(repl, sql)
+
+
+# асинхронный аналог PostgresDB: тот же набор execute/fetchone/fetchall с плейсхолдерами %s,
+# но поверх собственного пула asyncpg - запросы не блокируют event loop
+class AsyncPostgresDB:
+    def __init__(
+        self,
+        *,
+        host: str,
+        port: int,
+        dbname: str,
+        user: str,
+        password: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 30.0,
+    ) -> None:
+        self._dsn = {
+            "host": host,
+            "port": port,
+            "database": dbname,
+            "user": user,
+            "password": password,
+        }
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self._pool: Any = None
+        self._open_lock = asyncio.Lock()
+        # соединение, закреплённое за транзакцией текущей задачи
+        self._bound: ContextVar[Any] = ContextVar(f"async_db_conn_{id(self)}", default=None)
+
+    # пул создаётся при первом запросе
+    async def open(self) -> None:
+        if self._pool is not None:
+            return
+        async with self._open_lock:
+            if self._pool is None:
+                self._pool = await asyncpg.create_pool(
+                    **self._dsn, min_size=self.min_size, max_size=self.max_size
+                )
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[Any]:
+        bound = self._bound.get()
+        if bound is not None:
+            yield bound
+            return
+        await self.open()
+        async with self._pool.acquire(timeout=self.timeout) as conn:
+            yield conn
+
+    # несколько запросов одной транзакцией; при исключении - откат
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        if self._bound.get() is not None:
+            yield
+            return
+        async with self.connection() as conn:
+            token = self._bound.set(conn)
+            try:
+                async with conn.transaction():
+                    yield
+            finally:
+                self._bound.reset(token)
+
+    async def execute(self, sql: str, params: tuple[Any, ...] | None = None) -> int:
+        async with self.connection() as conn:
+            try:
+                status: str = await conn.execute(_translate(sql), *(params or ()))
+            except asyncpg.UniqueViolationError as e:
+                raise UniqueViolation(e.constraint_name, str(e)) from e
+        # статус вида "UPDATE 3" / "INSERT 0 1" - число строк в конце
+        tail = status.rsplit(" ", 1)[-1]
+        return int(tail) if tail.isdigit() else 0
+
+    async def fetchone(
+        self, sql: str, params: tuple[Any, ...] | None = None
+    ) -> dict[str, Any] | None:
+        async with self.connection() as conn:
+            row = await conn.fetchrow(_translate(sql), *(params or ()))
+        return dict(row) if row else None
+
+    async def fetchall(
+        self, sql: str, params: tuple[Any, ...] | None = None
+    ) -> list[dict[str, Any]]:
+        async with self.connection() as conn:
+            rows = await conn.fetch(_translate(sql), *(params or ()))
+        return [dict(r) for r in rows]
+
+    async def estimate_rows(self, sql: str, params: tuple[Any, ...] | None = None) -> int:
+        row = await self.fetchone(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        if not row:
+            return 0
+        plan: Any = row["QUERY PLAN"]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    # потоковое чтение курсором asyncpg (нужна транзакция); в памяти не больше batch_size строк
+    async def iter_rows(
+        self, sql: str, params: tuple[Any, ...] | None = None, batch_size: int = 1000
+    ) -> AsyncIterator[dict[str, Any]]:
+        async with self.connection() as conn, conn.transaction():
+            async for r in conn.cursor(_translate(sql), *(params or ()), prefetch=batch_size):
+                yield dict(r)
+
+    def stats(self) -> dict[str, int]:
+        if self._pool is None:
+            return {"size": 0, "idle": 0, "min_size": self.min_size, "max_size": self.max_size}
+        return {
+            "size": self._pool.get_size(),
+            "idle": self._pool.get_idle_size(),
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+        }
@@ -1,13 +1,69 @@
 from __future__ import annotations
 
-from collections.abc import Iterator
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
 from contextlib import contextmanager
+import itertools
+import json
+import re
 import threading
-from typing import Any
+import time
+from typing import IO, Any, TypeVar
 
 import psycopg2
+import psycopg2.errors
 import psycopg2.extras
 
+T = TypeVar("T")
+
+# ошибки, после которых соединение считаем сломанным
+_CONN_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+# PREPARE принимает только такие запросы (DDL, COPY, ANALYZE выполняем как есть)
+_PREPARABLE_RE = re.compile(r"\s*(SELECT|INSERT|UPDATE|DELETE|WITH|VALUES)\b", re.IGNORECASE)
+# плейсхолдеры psycopg2 (%s, %%) -> параметры PREPARE ($1, $2, ..., %)
+_PARAM_RE = re.compile(r"%%|%s")
+# столько SQL, для которых PREPARE не удался, помним, чтобы не пробовать снова
+_UNPREPARABLE_MAX = 1024
+# готовим только SQL, встреченный повторно: разовые тексты (списки IN (...) переменной длины,
+# staging массовой загрузки, произвольные where) не платят за PREPARE и не вытесняют частые
+_SEEN_ONCE_MAX = 4096
+
+
+def _to_dollar(sql: str) -> tuple[str, int]:
+    n = 0
+
+    def repl(m: re.Match[str]) -> str:
+        nonlocal n
+        if m.group(0) == "%%":
+            return "%"
+        n += 1
+        return f"${n}"
+
+    return _PARAM_RE.sub(repl, sql), n
+
+
+class PoolTimeoutError(TimeoutError):
+    pass
+
+
+# нарушение уникального ограничения/индекса; constraint - его имя (для PK - "<таблица>_pkey")
+class UniqueViolation(Exception):
+    def __init__(self, constraint: str | None, message: str = "") -> None:
+        super().__init__(message or f"нарушено ограничение уникальности {constraint}")
+        self.constraint = constraint
+
+
+# соединение пула + служебные данные о нём
+class _PooledConn:
+    def __init__(self, conn: Any) -> None:
+        self.conn = conn
+        self.last_used = time.monotonic()
+        # подготовленные на сервере запросы этого соединения: текст SQL -> имя, порядок LRU;
+        # новое соединение (в т.ч. после переподключения) начинает с пустого кэша
+        self.statements: OrderedDict[str, str] = OrderedDict()
+        self.seq = itertools.count(1)
+
 
 class PostgresDB:
     _instance: PostgresDB | None = None
@@ -21,43 +77,447 @@ class PostgresDB:
                     cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self, *, host: str, port: int, dbname: str, user: str, password: str) -> None:
+    def __init__(
+        self,
+        *,
+        host: str,
+        port: int,
+        dbname: str,
+        user: str,
+        password: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 30.0,
+        health_check_after: float = 30.0,
+        statement_cache_size: int = 64,
+    ) -> None:
         if getattr(self, "_inited", False):
             return
-        self._conn: Any = psycopg2.connect(
-            host=host, port=port, dbname=dbname, user=user, password=password
-        )
-        self._conn.autocommit = True
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("нужно 0 <= min_size <= max_size и max_size >= 1")
+        self._dsn = {
+            "host": host,
+            "port": port,
+            "dbname": dbname,
+            "user": user,
+            "password": password,
+        }
+        self.min_size = min_size
+        self.max_size = max_size
+        # сколько ждать свободное соединение
+        self.timeout = timeout
+        # соединение, простоявшее дольше этого, проверяем SELECT 1 перед выдачей
+        self.health_check_after = health_check_after
+        # сколько подготовленных запросов держать на соединение (0 - не готовить)
+        self.statement_cache_size = statement_cache_size
+        # оба множества общие для соединений пула - менять только под self._cond
+        self._unpreparable: set[str] = set()
+        self._seen_once: OrderedDict[str, None] = OrderedDict()
+        self._cond = threading.Condition()
+        self._idle: list[_PooledConn] = []
+        self._size = 0
+        self._closed = False
+        # после обрыва одного соединения проверяем и все, что простаивали до него
+        self._suspect_before = 0.0
+        # соединение, закреплённое за транзакцией текущего потока
+        self._local = threading.local()
+        self._stats = {
+            "created": 0,
+            "discarded": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "reconnects": 0,
+            "stmt_hits": 0,
+            "stmt_prepares": 0,
+            "stmt_evictions": 0,
+            "stmt_unprepared": 0,
+        }
+        for _ in range(min_size):
+            self._idle.append(self._new_conn())
+            self._size += 1
         self._inited: bool = True
 
+    # ---------- пул ----------
+
+    def _new_conn(self) -> _PooledConn:
+        conn: Any = psycopg2.connect(**self._dsn)
+        conn.autocommit = True
+        with self._cond:
+            self._stats["created"] += 1
+        return _PooledConn(conn)
+
+    def _healthy(self, pc: _PooledConn) -> bool:
+        if pc.conn.closed:
+            return False
+        recent = time.monotonic() - pc.last_used < self.health_check_after
+        if recent and pc.last_used > self._suspect_before:
+            return True
+        try:
+            with pc.conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            return True
+        except _CONN_ERRORS:
+            return False
+
+    def _checkout(self) -> _PooledConn:
+        deadline = time.monotonic() + self.timeout
+        pc: _PooledConn | None = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("пул соединений закрыт")
+                if self._idle:
+                    pc = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeoutError(
+                        f"нет свободного соединения за {self.timeout} с (max_size={self.max_size})"
+                    )
+                self._stats["waits"] += 1
+                self._cond.wait(remaining)
+            self._stats["checkouts"] += 1
+
+        try:
+            if pc is None:
+                return self._new_conn()
+            if not self._healthy(pc):
+                # автоматическое переподключение вместо сломанного соединения
+                self._close_quietly(pc)
+                with self._cond:
+                    self._stats["discarded"] += 1
+                    self._stats["reconnects"] += 1
+                return self._new_conn()
+            return pc
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def _checkin(self, pc: _PooledConn, broken: bool = False) -> None:
+        if not broken and not pc.conn.closed and not pc.conn.autocommit:
+            # соединение вернули посреди транзакции - откатываем
+            try:
+                pc.conn.rollback()
+                pc.conn.autocommit = True
+            except _CONN_ERRORS:
+                broken = True
+        with self._cond:
+            if broken or pc.conn.closed or self._closed:
+                if not self._closed:
+                    self._suspect_before = time.monotonic()
+                self._size -= 1
+                self._stats["discarded"] += 1
+                self._close_quietly(pc)
+            else:
+                pc.last_used = time.monotonic()
+                self._idle.append(pc)
+            self._cond.notify()
+
+    @staticmethod
+    def _close_quietly(pc: _PooledConn) -> None:
+        try:
+            pc.conn.close()
+        except Exception:
+            pass
+
     @contextmanager
-    def cursor(self) -> Iterator[Any]:
-        cur: Any = self._conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+    def _pooled(self) -> Iterator[_PooledConn]:
+        bound: _PooledConn | None = getattr(self._local, "pc", None)
+        if bound is not None:
+            yield bound
+            return
+        pc = self._checkout()
+        broken = False
         try:
+            yield pc
+        except _CONN_ERRORS:
+            broken = True
+            raise
+        finally:
+            self._checkin(pc, broken)
+
+    # соединение на время вызова (или закреплённое за текущей транзакцией)
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        with self._pooled() as pc:
+            yield pc.conn
+
+    def stats(self) -> dict[str, int]:
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                **self._stats,
+            }
+
+    # ---------- запросы ----------
+
+    @contextmanager
+    def _cursor(self) -> Iterator[tuple[_PooledConn, Any]]:
+        with self._pooled() as pc:
+            cur: Any = pc.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+            try:
+                yield pc, cur
+            finally:
+                cur.close()
+
+    @contextmanager
+    def cursor(self) -> Iterator[Any]:
+        with self._cursor() as (_, cur):
             yield cur
+
+    # несколько запросов одной транзакцией; при исключении - откат
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        bound: _PooledConn | None = getattr(self._local, "pc", None)
+        if bound is not None and not bound.conn.autocommit:
+            # вложенная транзакция - просто часть внешней
+            yield
+            return
+        # внутри session() транзакция идёт на её соединении
+        pc = bound or self._checkout()
+        broken = False
+        try:
+            pc.conn.autocommit = False
+            self._local.pc = pc
+            yield
+            pc.conn.commit()
+        except _CONN_ERRORS:
+            broken = True
+            raise
+        except Exception:
+            try:
+                pc.conn.rollback()
+            except _CONN_ERRORS:
+                broken = True
+            raise
         finally:
-            cur.close()
+            # соединение возвращается в пул при любом исходе; сломанное пул закроет
+            if not broken:
+                try:
+                    pc.conn.autocommit = True
+                except _CONN_ERRORS:
+                    broken = True
+            if bound is None:
+                self._local.pc = None
+                self._checkin(pc, broken)
+
+    # запросы потока идут по одному соединению, но без транзакции (autocommit): так живут
+    # advisory-блокировки сессии и CREATE INDEX CONCURRENTLY; transaction() внутри открывает
+    # транзакцию на этом же соединении
+    @contextmanager
+    def session(self) -> Iterator[None]:
+        if getattr(self._local, "pc", None) is not None:
+            yield
+            return
+        with self._pooled() as pc:
+            self._local.pc = pc
+            try:
+                yield
+            finally:
+                self._local.pc = None
+
+    # ---------- подготовленные запросы ----------
+
+    def _run(self, pc: _PooledConn, cur: Any, sql: str, params: tuple[Any, ...] | None) -> None:
+        try:
+            self._run_stmt(pc, cur, sql, params or ())
+        except psycopg2.errors.UniqueViolation as e:
+            raise UniqueViolation(e.diag.constraint_name, str(e).strip()) from e
+
+    # выполнить через именованный PREPARE/EXECUTE соединения: разбор и план - один раз
+    def _run_stmt(self, pc: _PooledConn, cur: Any, sql: str, params: tuple[Any, ...]) -> None:
+        if self.statement_cache_size <= 0 or not _PREPARABLE_RE.match(sql):
+            cur.execute(sql, params)
+            return
+        name = pc.statements.get(sql)
+        if name is not None:
+            pc.statements.move_to_end(sql)
+            with self._cond:
+                self._stats["stmt_hits"] += 1
+        else:
+            if not self._worth_preparing(sql):
+                cur.execute(sql, params)
+                return
+            name = self._prepare(pc, cur, sql, len(params))
+            if name is None:
+                cur.execute(sql, params)
+                return
+        marks = ", ".join(["%s"] * len(params))
+        execute_sql = f"EXECUTE {name} ({marks})" if params else f"EXECUTE {name}"
+        try:
+            cur.execute(execute_sql, params)
+        except psycopg2.errors.InvalidSqlStatementName:
+            # запрос удалён на сервере (DISCARD/DEALLOCATE ALL) - готовим заново, если не в транзакции
+            pc.statements.clear()
+            if not pc.conn.autocommit:
+                raise
+            self._run_stmt(pc, cur, sql, params)
+
+    # первый раз SQL только запоминаем, готовим со второго
+    def _worth_preparing(self, sql: str) -> bool:
+        with self._cond:
+            if sql in self._unpreparable:
+                return False
+            if sql in self._seen_once:
+                self._seen_once.move_to_end(sql)
+                return True
+            self._seen_once[sql] = None
+            if len(self._seen_once) > _SEEN_ONCE_MAX:
+                self._seen_once.popitem(last=False)
+            return False
+
+    def _prepare(self, pc: _PooledConn, cur: Any, sql: str, n_params: int) -> str | None:
+        text, n = _to_dollar(sql)
+        if n != n_params:
+            return None
+        name = f"stmt_{next(pc.seq)}"
+        if not self._try_execute(pc, cur, f"PREPARE {name} AS {text}"):
+            # например, тип параметра не выводится - такой SQL выполняем без подготовки
+            with self._cond:
+                if len(self._unpreparable) >= _UNPREPARABLE_MAX:
+                    self._unpreparable.clear()
+                self._unpreparable.add(sql)
+                self._stats["stmt_unprepared"] += 1
+            return None
+        evicted = 0
+        while len(pc.statements) >= self.statement_cache_size:
+            _, old = pc.statements.popitem(last=False)
+            # запроса может уже не быть (DEALLOCATE ALL) - это не ошибка
+            self._try_execute(pc, cur, f"DEALLOCATE {old}")
+            evicted += 1
+        pc.statements[sql] = name
+        with self._cond:
+            self._stats["stmt_prepares"] += 1
+            self._stats["stmt_evictions"] += evicted
+        return name
+
+    # служебная команда кэша; внутри транзакции - под SAVEPOINT, чтобы её ошибка не ломала транзакцию
+    @staticmethod
+    def _try_execute(pc: _PooledConn, cur: Any, sql: str) -> bool:
+        in_tx = not pc.conn.autocommit
+        try:
+            if in_tx:
+                cur.execute("SAVEPOINT stmt_cache")
+            cur.execute(sql)
+            if in_tx:
+                cur.execute("RELEASE SAVEPOINT stmt_cache")
+            return True
+        except psycopg2.errors.InvalidSqlStatementName:
+            pass
+        except _CONN_ERRORS:
+            raise
+        except psycopg2.Error:
+            pass
+        if in_tx:
+            cur.execute("ROLLBACK TO SAVEPOINT stmt_cache")
+            cur.execute("RELEASE SAVEPOINT stmt_cache")
+        return False
+
+    # чтение повторяем один раз на новом соединении, если старое оборвалось;
+    # запись не повторяем - неизвестно, успела ли она выполниться
+    def _read(self, fn: Callable[[_PooledConn, Any], T]) -> T:
+        retry = getattr(self._local, "pc", None) is None
+        while True:
+            try:
+                with self._cursor() as (pc, cur):
+                    return fn(pc, cur)
+            except _CONN_ERRORS:
+                if not retry:
+                    raise
+                retry = False
+                with self._cond:
+                    self._stats["reconnects"] += 1
 
     def execute(self, sql: str, params: tuple[Any, ...] | None = None) -> int:
-        with self.cursor() as cur:
-            cur.execute(sql, params or ())
+        with self._cursor() as (pc, cur):
+            self._run(pc, cur, sql, params)
             # rowcount гарантированно int
             return int(cur.rowcount)
 
-    def fetchone(self, sql: str, params: tuple[Any, ...] | None = None) -> dict[str, Any] | None:
+    # COPY ... FROM STDIN из файлоподобного объекта - массовая загрузка без построчных INSERT
+    def copy_from(self, sql: str, data: IO[str]) -> None:
         with self.cursor() as cur:
-            cur.execute(sql, params or ())
+            cur.copy_expert(sql, data)
+
+    def fetchone(self, sql: str, params: tuple[Any, ...] | None = None) -> dict[str, Any] | None:
+        def run(pc: _PooledConn, cur: Any) -> dict[str, Any] | None:
+            self._run(pc, cur, sql, params)
             row: Any = cur.fetchone()
             return dict(row) if row else None
 
+        return self._read(run)
+
     def fetchall(self, sql: str, params: tuple[Any, ...] | None = None) -> list[dict[str, Any]]:
-        with self.cursor() as cur:
-            cur.execute(sql, params or ())
+        def run(pc: _PooledConn, cur: Any) -> list[dict[str, Any]]:
+            self._run(pc, cur, sql, params)
             rows: Any = cur.fetchall() or []
             return [dict(r) for r in rows]
 
+        return self._read(run)
+
+    # оценка числа строк запроса по плану (EXPLAIN) - без выполнения самого запроса
+    def estimate_rows(self, sql: str, params: tuple[Any, ...] | None = None) -> int:
+        row = self.fetchone(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        if not row:
+            return 0
+        plan: Any = row["QUERY PLAN"]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    # потоковое чтение именованным (серверным) курсором: в памяти не больше batch_size строк;
+    # соединение занято, пока итератор не исчерпан или не закрыт
+    def iter_rows(
+        self, sql: str, params: tuple[Any, ...] | None = None, batch_size: int = 1000
+    ) -> Iterator[dict[str, Any]]:
+        with self._pooled() as pc:
+            # серверный курсор живёт только внутри транзакции; свою неявную транзакцию
+            # откатываем сами - соединение может быть закреплено за session()
+            own_tx = pc.conn.autocommit
+            if own_tx:
+                pc.conn.autocommit = False
+            cur: Any = pc.conn.cursor(
+                f"stream_{next(pc.seq)}", cursor_factory=psycopg2.extras.RealDictCursor
+            )
+            try:
+                cur.execute(sql, params or ())
+                while True:
+                    rows: Any = cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    for r in rows:
+                        yield dict(r)
+            finally:
+                try:
+                    cur.close()
+                except psycopg2.Error:
+                    pass
+                if own_tx and not pc.conn.closed:
+                    try:
+                        pc.conn.rollback()
+                        pc.conn.autocommit = True
+                    except _CONN_ERRORS:
+                        pass
+
     def close(self) -> None:
-        if getattr(self, "_conn", None):
-            self._conn.close()
-            self._conn = None
-            self._inited = False
+        if not getattr(self, "_inited", False):
+            return
+        with self._cond:
+            self._closed = True
+            for pc in self._idle:
+                self._close_quietly(pc)
+                self._size -= 1
+            self._idle.clear()
+            self._cond.notify_all()
+        self._inited = False
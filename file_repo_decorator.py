@@ -1,30 +1,77 @@
 from __future__ import annotations
 
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+import heapq
+import sys
 from typing import Any, cast
 
 from file_spec import FileQuerySpec
+from filter_spec import Condition, FilterSpec, as_file_spec
 from Instructor import Instructor
-from instructor_repo_iface import InstructorRepo
+from instructor_repo_iface import BatchResult, InstructorRepo
 from PublicInstructorProfile import PublicInstructorProfile
+from trigram_index import TrigramIndex
+
+# сколько разных spec держим уже отсортированными
+_ORDER_CACHE_SIZE = 16
+# частичный отбор кучей, пока нужный префикс порядка не больше 1/_TOPK_RATIO всех записей
+_TOPK_RATIO = 10
+# сколько первых элементов отбираем сразу: несколько начальных страниц за одно чтение
+_TOPK_MIN = 1000
+_FULL = sys.maxsize
+
+
+def _default_key(x: Any) -> tuple:
+    return (x.last_name, x.first_name, (x.patronymic or ""), x.instructor_id)
+
+
+@dataclass
+class _SpecOrder:
+    # отсортированный префикс порядка (complete=True - весь отфильтрованный список)
+    items: list = field(default_factory=list)
+    complete: bool = False
+    # число подходящих записей, если считали отдельным проходом
+    count: int | None = None
 
 
 class FileFilterSortDecorator(InstructorRepo):
     def __init__(self, base_repo: InstructorRepo):
         self._repo = base_repo
+        # отсортированный порядок (или его начало) по spec: страницы режутся из него без
+        # повторной сортировки, пока state_token базового репозитория не изменился
+        self._orders: OrderedDict[FileQuerySpec | None, _SpecOrder] = OrderedDict()
+        self._orders_token: tuple | None = None
 
     # прокидываем базовые операции как есть
     def get_by_id(self, instructor_id: int) -> Instructor | None:
         return self._repo.get_by_id(instructor_id)
 
     def add(self, item: Instructor) -> Instructor:
+        self._drop_orders()
         return self._repo.add(item)
 
     def replace_by_id(self, instructor_id: int, new_item: Instructor) -> bool:
+        self._drop_orders()
         return self._repo.replace_by_id(instructor_id, new_item)
 
     def delete_by_id(self, instructor_id: int) -> bool:
+        self._drop_orders()
         return self._repo.delete_by_id(instructor_id)
 
+    def add_many(self, items: list[Instructor]) -> BatchResult:
+        self._drop_orders()
+        return self._repo.add_many(items)
+
+    def replace_many(self, items: list[tuple[int, Instructor]]) -> BatchResult:
+        self._drop_orders()
+        return self._repo.replace_many(items)
+
+    def delete_many(self, instructor_ids: list[int]) -> BatchResult:
+        self._drop_orders()
+        return self._repo.delete_many(instructor_ids)
+
     def _read_all(self) -> list:
         if hasattr(self._repo, "read_all") and callable(self._repo.read_all):
             return cast(list[Any], self._repo.read_all())
@@ -41,35 +88,125 @@ class FileFilterSortDecorator(InstructorRepo):
         return items
 
     def _to_public(self, x: Any) -> PublicInstructorProfile:
-        return x if isinstance(x, PublicInstructorProfile) else PublicInstructorProfile(x)
+        return (
+            x
+            if isinstance(x, PublicInstructorProfile)
+            else PublicInstructorProfile.from_instructor(x)
+        )
 
-    def get_count(self, spec: FileQuerySpec | None = None) -> int:
-        items = self._read_all()
+    # ---------- кэш отсортированного порядка ----------
+
+    def _drop_orders(self) -> None:
+        self._orders.clear()
+        self._orders_token = None
+
+    def _state_token(self) -> tuple | None:
+        fn = getattr(self._repo, "state_token", None)
+        return cast(tuple, fn()) if callable(fn) else None
+
+    # spec сравнивается по своим полям: одна и та же функция predicate/key даёт попадание,
+    # а новая lambda на каждый вызов - нет; None - кэшировать нельзя
+    def _cached(self, spec: FileQuerySpec | None) -> _SpecOrder | None:
+        token = self._state_token()
+        try:
+            hash(spec)
+        except TypeError:
+            token = None
+        if token is None:
+            # без отпечатка не узнать об изменении файла
+            return None
+        if token != self._orders_token:
+            self._orders.clear()
+            self._orders_token = token
+        entry = self._orders.get(spec)
+        if entry is None:
+            entry = self._orders[spec] = _SpecOrder()
+            if len(self._orders) > _ORDER_CACHE_SIZE:
+                self._orders.popitem(last=False)
+        else:
+            self._orders.move_to_end(spec)
+        return entry
+
+    # первые need элементов порядка и признак, что это весь отфильтрованный список;
+    # при малом need - куча за O(N log need), результат тот же, что у sorted(...)[:need]
+    def _select(
+        self, spec: FileQuerySpec | None, need: int, conds: tuple[Condition, ...] = ()
+    ) -> tuple[list, bool]:
+        items = self._candidates(conds)
+        matched: Iterable[Any] = items
+        if spec and spec.predicate:
+            matched = filter(spec.predicate, items)
+        key: Callable[[Any], Any] = _default_key
+        reverse = False
+        if spec and spec.key:
+            key, reverse = spec.key, spec.reverse
+        if need * _TOPK_RATIO <= len(items):
+            top = (heapq.nlargest if reverse else heapq.nsmallest)(need, matched, key=key)
+            return top, len(top) < need
+        return sorted(matched, key=key, reverse=reverse), True
+
+    # записи для проверки предикатом: по вторичным индексам репозитория, если условия
+    # декларативные и индекс есть, иначе все
+    def _candidates(self, conds: tuple[Condition, ...]) -> list:
+        find = getattr(self._repo, "find_candidates", None)
+        if conds and callable(find):
+            found = find(conds)
+            if found is not None:
+                return cast(list[Any], found)
+        return self._read_all()
+
+    # один проход без построения отфильтрованного списка
+    def _count(self, spec: FileQuerySpec | None, conds: tuple[Condition, ...] = ()) -> int:
         if spec and spec.predicate:
-            items = [x for x in items if spec.predicate(x)]
-        return len(items)
+            return sum(1 for x in self._candidates(conds) if spec.predicate(x))
+        return len(self._read_all())
+
+    def get_count(self, spec: FileQuerySpec | FilterSpec | None = None) -> int:
+        conds = spec.conditions if isinstance(spec, FilterSpec) else ()
+        spec = as_file_spec(spec)
+        entry = self._cached(spec)
+        if entry is None:
+            return self._count(spec, conds)
+        if entry.complete:
+            return len(entry.items)
+        if entry.count is None:
+            entry.count = self._count(spec, conds)
+        return entry.count
 
     def get_k_n_short_list(
-        self, k: int, n: int, spec: FileQuerySpec | None = None
+        self, k: int, n: int, spec: FileQuerySpec | FilterSpec | None = None
     ) -> list[PublicInstructorProfile]:
         if k <= 0 or n <= 0:
             return []
-        items = self._read_all()
-
-        if spec and spec.predicate:
-            items = [x for x in items if spec.predicate(x)]
-        if spec and spec.key:
-            items = sorted(items, key=spec.key, reverse=spec.reverse)
+        conds = spec.conditions if isinstance(spec, FilterSpec) else ()
+        spec = as_file_spec(spec)
+        start, end = (k - 1) * n, k * n
+        entry = self._cached(spec)
+        if entry is None:
+            items, _ = self._select(spec, end, conds)
         else:
-            items = sorted(
-                items,
-                key=lambda x: (x.last_name, x.first_name, (x.patronymic or ""), x.instructor_id),
-            )
+            if not entry.items and not entry.complete:
+                entry.items, entry.complete = self._select(spec, max(end, _TOPK_MIN), conds)
+            elif not entry.complete and len(entry.items) < end:
+                # страница за пределами отобранного начала - дальше листают, сортируем всё
+                entry.items, entry.complete = self._select(spec, _FULL, conds)
+            items = entry.items
+        return [self._to_public(i) for i in items[start:end]]
 
-        start = (k - 1) * n
-        page = items[start : start + n]
-        return [self._to_public(i) for i in page]
+    # нечёткий поиск по фамилии - индексом триграмм базового репозитория
+    def search(self, text: str, limit: int = 20) -> list[PublicInstructorProfile]:
+        base_search = getattr(self._repo, "search", None)
+        if callable(base_search):
+            return cast(list[PublicInstructorProfile], base_search(text, limit))
+        # у репозитория поиска нет - разовый индекс по всем записям
+        items = self._read_all()
+        index = TrigramIndex()
+        for x in items:
+            index.add(x.instructor_id, x.last_name)
+        by_id = {x.instructor_id: x for x in items}
+        return [self._to_public(by_id[iid]) for iid, _ in index.search(text, limit)]
 
     def sort_by_last_name(self, reverse: bool = False) -> list[Instructor]:
+        self._drop_orders()
         base_sort = getattr(self._repo, "sort_by_last_name", None)
         return cast(list[Instructor], base_sort(reverse=reverse))  # type: ignore[misc]
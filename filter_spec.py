@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any
+
+from file_spec import FileQuerySpec
+from Instructor import Instructor
+from spec import QuerySpec
+
+# декларативный запрос: условия и сортировка описаны данными, а не lambda, поэтому один и тот же
+# объект компилируется и в фильтр Python для файловых хранилищ, и в параметризованный SQL
+
+_FIELDS = ("instructor_id", "last_name", "first_name", "patronymic", "phone", "experience_years")
+_NULLABLE = {"patronymic"}
+# eq - равенство (None - IS NULL), range - (lo, hi) включительно, None - открытая граница,
+# prefix - начало строки с учётом регистра (LIKE 'Ив%'), in - одно из значений
+_OPS = ("eq", "range", "prefix", "in")
+
+
+@dataclass(frozen=True)
+class Condition:
+    field: str
+    op: str
+    value: Any
+
+    def __post_init__(self) -> None:
+        if self.field not in _FIELDS:
+            raise ValueError(f"неизвестное поле фильтра: {self.field}")
+        if self.op not in _OPS:
+            raise ValueError(f"неизвестная операция фильтра: {self.op}")
+        # значения приводим к кортежам: spec остаётся хэшируемым и годится в ключ кэша
+        if self.op == "range":
+            if not isinstance(self.value, (tuple, list)) or len(self.value) != 2:
+                raise ValueError("range ожидает пару (lo, hi)")
+            object.__setattr__(self, "value", tuple(self.value))
+        elif self.op == "in":
+            object.__setattr__(self, "value", tuple(self.value))
+        elif self.op == "prefix" and not isinstance(self.value, str):
+            raise ValueError("prefix ожидает строку")
+
+
+@dataclass(frozen=True)
+class SortTerm:
+    field: str
+    desc: bool = False
+
+    def __post_init__(self) -> None:
+        if self.field not in _FIELDS:
+            raise ValueError(f"неизвестное поле сортировки: {self.field}")
+
+
+@dataclass(frozen=True)
+class FilterSpec:
+    conditions: tuple[Condition, ...] = ()
+    # пустой порядок - сортировка по ФИО, как у декораторов без spec
+    order: tuple[SortTerm, ...] = ()
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "conditions", tuple(self.conditions))
+        object.__setattr__(self, "order", tuple(self.order))
+
+    def to_file_spec(self) -> FileQuerySpec:
+        return _compile_file(self)
+
+    def to_query_spec(self) -> QuerySpec:
+        return _compile_sql(self)
+
+
+def as_file_spec(spec: FileQuerySpec | FilterSpec | None) -> FileQuerySpec | None:
+    return spec.to_file_spec() if isinstance(spec, FilterSpec) else spec
+
+
+def as_query_spec(spec: QuerySpec | FilterSpec | None) -> QuerySpec:
+    if isinstance(spec, FilterSpec):
+        return spec.to_query_spec()
+    return spec or QuerySpec()
+
+
+# ---------- Python ----------
+
+
+def _condition_predicate(c: Condition) -> Callable[[Any], bool]:
+    get = attrgetter(c.field)
+    if c.op == "eq":
+        value = c.value
+        return lambda x: bool(get(x) == value)
+    if c.op == "range":
+        lo, hi = c.value
+        if lo is None and hi is None:
+            return lambda x: get(x) is not None
+        if lo is None:
+            return lambda x: (v := get(x)) is not None and bool(v <= hi)
+        if hi is None:
+            return lambda x: (v := get(x)) is not None and bool(lo <= v)
+        return lambda x: (v := get(x)) is not None and bool(lo <= v <= hi)
+    if c.op == "prefix":
+        prefix = c.value
+        return lambda x: (v := get(x)) is not None and bool(v.startswith(prefix))
+    values = frozenset(c.value)
+    return lambda x: get(x) in values
+
+
+# обёртка для убывающего поля внутри составного ключа: сравнение наоборот
+class _Desc:
+    __slots__ = ("v",)
+
+    def __init__(self, v: Any) -> None:
+        self.v = v
+
+    def __lt__(self, other: _Desc) -> bool:
+        return bool(other.v < self.v)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Desc) and bool(self.v == other.v)
+
+    __hash__ = None  # type: ignore[assignment]
+
+
+def _sort_key(order: tuple[SortTerm, ...]) -> tuple[Callable[[Any], Any], bool]:
+    # instructor_id в конце делает порядок строгим, как в keyset.parse_order
+    if all(t.field != "instructor_id" for t in order):
+        order = order + (SortTerm("instructor_id", order[-1].desc),)
+    # NULL как в PostgreSQL: в конце по возрастанию, в начале по убыванию
+    getters = [
+        (
+            (lambda x, g=attrgetter(t.field): ((v := g(x)) is None, v or ""))
+            if t.field in _NULLABLE
+            else attrgetter(t.field)
+        )
+        for t in order
+    ]
+    reverse = order[0].desc
+    if all(t.desc == reverse for t in order):
+        # одно направление - обычный кортеж и reverse
+        return (lambda x: tuple(g(x) for g in getters)), reverse
+    parts = list(zip(getters, [t.desc for t in order], strict=True))
+    return (lambda x: tuple(_Desc(g(x)) if d else g(x) for g, d in parts)), False
+
+
+# один и тот же FilterSpec даёт один и тот же FileQuerySpec - кэши декоратора по spec попадают
+@lru_cache(maxsize=256)
+def _compile_file(spec: FilterSpec) -> FileQuerySpec:
+    predicate: Callable[[Instructor], bool] | None = None
+    preds = [_condition_predicate(c) for c in spec.conditions]
+    if len(preds) == 1:
+        predicate = preds[0]
+    elif preds:
+
+        def predicate(x: Instructor) -> bool:
+            for p in preds:
+                if not p(x):
+                    return False
+            return True
+
+    if not spec.order:
+        return FileQuerySpec(predicate=predicate)
+    key, reverse = _sort_key(spec.order)
+    return FileQuerySpec(predicate=predicate, key=key, reverse=reverse)
+
+
+# ---------- SQL ----------
+
+
+def _like_prefix(prefix: str) -> str:
+    return prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _condition_sql(c: Condition) -> tuple[str, tuple]:
+    f = c.field
+    if c.op == "eq":
+        if c.value is None:
+            return f"{f} IS NULL", ()
+        return f"{f} = %s", (c.value,)
+    if c.op == "range":
+        lo, hi = c.value
+        if lo is None and hi is None:
+            return f"{f} IS NOT NULL", ()
+        if lo is None:
+            return f"{f} <= %s", (hi,)
+        if hi is None:
+            return f"{f} >= %s", (lo,)
+        return f"{f} BETWEEN %s AND %s", (lo, hi)
+    if c.op == "prefix":
+        # LIKE с литеральным префиксом идёт по индексу text_pattern_ops (миграция 4)
+        return f"{f} LIKE %s ESCAPE '\\'", (_like_prefix(c.value),)
+    values = tuple(v for v in c.value if v is not None)
+    parts = [f"{f} IN ({', '.join(['%s'] * len(values))})"] if values else []
+    if len(values) < len(c.value):
+        parts.append(f"{f} IS NULL")
+    if not parts:
+        return "1 = 0", ()
+    return (parts[0] if len(parts) == 1 else f"({' OR '.join(parts)})"), values
+
+
+@lru_cache(maxsize=256)
+def _compile_sql(spec: FilterSpec) -> QuerySpec:
+    where: list[str] = []
+    params: tuple = ()
+    for c in spec.conditions:
+        sql, p = _condition_sql(c)
+        where.append(sql)
+        params += p
+    order_by = ""
+    if spec.order:
+        terms = [f"{t.field} {'DESC' if t.desc else 'ASC'}" for t in spec.order]
+        if all(t.field != "instructor_id" for t in spec.order):
+            terms.append(f"instructor_id {'DESC' if spec.order[-1].desc else 'ASC'}")
+        order_by = ", ".join(terms)
+    return QuerySpec(where=" AND ".join(where), params=params, order_by=order_by)
@@ -1,11 +1,39 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 from typing import Protocol
 
 from Instructor import Instructor
 from PublicInstructorProfile import PublicInstructorProfile
 
 
+# результат одного элемента пакетной операции
+@dataclass(frozen=True)
+class BatchItemResult:
+    index: int
+    ok: bool
+    instructor_id: int | None = None
+    error: str | None = None
+
+
+# пакет применяется целиком или не применяется вовсе: committed=False - ничего не записано
+@dataclass(frozen=True)
+class BatchResult:
+    committed: bool
+    items: list[BatchItemResult] = field(default_factory=list)
+
+    @property
+    def failed(self) -> list[BatchItemResult]:
+        return [r for r in self.items if not r.ok]
+
+
+# итог массовой загрузки: записано loaded строк, отвергнутые - с индексом во входе и причиной
+@dataclass(frozen=True)
+class BulkLoadReport:
+    loaded: int
+    rejected: list[BatchItemResult] = field(default_factory=list)
+
+
 class InstructorRepo(Protocol):
     def get_by_id(self, instructor_id: int) -> Instructor | None: ...
     def get_k_n_short_list(self, k: int, n: int) -> list[PublicInstructorProfile]: ...
@@ -14,3 +42,20 @@ class InstructorRepo(Protocol):
     def delete_by_id(self, instructor_id: int) -> bool: ...
     def get_count(self) -> int: ...
     def sort_by_last_name(self, reverse: bool = False) -> list[Instructor]: ...
+    def add_many(self, items: list[Instructor]) -> BatchResult: ...
+    def replace_many(self, items: list[tuple[int, Instructor]]) -> BatchResult: ...
+    def delete_many(self, instructor_ids: list[int]) -> BatchResult: ...
+
+
+# то же для asyncio-бэкендов
+class AsyncInstructorRepo(Protocol):
+    async def get_by_id(self, instructor_id: int) -> Instructor | None: ...
+    async def get_k_n_short_list(self, k: int, n: int) -> list[PublicInstructorProfile]: ...
+    async def add(self, item: Instructor) -> Instructor: ...
+    async def replace_by_id(self, instructor_id: int, new_item: Instructor) -> bool: ...
+    async def delete_by_id(self, instructor_id: int) -> bool: ...
+    async def get_count(self) -> int: ...
+    async def sort_by_last_name(self, reverse: bool = False) -> list[Instructor]: ...
+    async def add_many(self, items: list[Instructor]) -> BatchResult: ...
+    async def replace_many(self, items: list[tuple[int, Instructor]]) -> BatchResult: ...
+    async def delete_many(self, instructor_ids: list[int]) -> BatchResult: ...
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import base64
+import binascii
+from dataclasses import dataclass
+import json
+from typing import Any
+
+# keyset (seek) пагинация: вместо OFFSET продолжаем с последней строки страницы,
+# сравнивая кортеж ключей сортировки - цена страницы не зависит от её номера
+
+# колонки, где возможен NULL; в ключе они раскладываются на (col IS NULL, COALESCE(col, ''))
+_NULLABLE = {"patronymic"}
+
+_DEFAULT_ORDER = (
+    ("last_name", False),
+    ("first_name", False),
+    ("patronymic", False),
+    ("instructor_id", False),
+)
+
+
+@dataclass(frozen=True)
+class _Key:
+    expr: str
+    desc: bool
+    field: str
+    null_flag: bool = False
+
+    def value(self, row: dict[str, Any]) -> Any:
+        v = row.get(self.field)
+        if self.null_flag:
+            return v is None
+        if self.field in _NULLABLE:
+            return "" if v is None else v
+        return v
+
+
+# разбор "field [ASC|DESC], ..." по белому списку; при любой ошибке - порядок по умолчанию
+def parse_order(order_by: str | None, allowed: dict[str, str]) -> list[tuple[str, bool]]:
+    if not order_by or not order_by.strip():
+        return list(_DEFAULT_ORDER)
+    terms: list[tuple[str, bool]] = []
+    for chunk in order_by.split(","):
+        pieces = chunk.split()
+        if not pieces:
+            continue
+        if pieces[0] not in allowed or len(pieces) > 2:
+            return list(_DEFAULT_ORDER)
+        if len(pieces) == 2 and pieces[1].upper() not in ("ASC", "DESC"):
+            return list(_DEFAULT_ORDER)
+        terms.append((allowed[pieces[0]], len(pieces) == 2 and pieces[1].upper() == "DESC"))
+    if not terms:
+        return list(_DEFAULT_ORDER)
+    # instructor_id в конце делает порядок строгим
+    if all(f != "instructor_id" for f, _ in terms):
+        terms.append(("instructor_id", False))
+    return terms
+
+
+def _keys(order: list[tuple[str, bool]]) -> list[_Key]:
+    keys: list[_Key] = []
+    for field, desc in order:
+        if field in _NULLABLE:
+            # флаг NULL в направлении поля: по возрастанию NULL в конце, по убыванию - в начале,
+            # как NULLS LAST/FIRST у DbFilterSortDecorator._build_order_sql и файловых декораторов
+            keys.append(_Key(f"({field} IS NULL)", desc, field, null_flag=True))
+            keys.append(_Key(f"COALESCE({field}, '')", desc, field))
+        else:
+            keys.append(_Key(field, desc, field))
+    return keys
+
+
+def _signature(order: list[tuple[str, bool]]) -> str:
+    return ",".join(f"{f}:{'d' if d else 'a'}" for f, d in order)
+
+
+def order_sql(order: list[tuple[str, bool]]) -> str:
+    return "ORDER BY " + ", ".join(f"{k.expr} {'DESC' if k.desc else 'ASC'}" for k in _keys(order))
+
+
+# условие "строго после курсора" для WHERE
+def seek_sql(order: list[tuple[str, bool]], values: list[Any]) -> tuple[str, tuple]:
+    keys = _keys(order)
+    ors: list[str] = []
+    params: list[Any] = []
+    for i, key in enumerate(keys):
+        parts = [f"{k.expr} = %s" for k in keys[:i]]
+        parts.append(f"{key.expr} {'<' if key.desc else '>'} %s")
+        params.extend(values[: i + 1])
+        ors.append("(" + " AND ".join(parts) + ")")
+    # нестрогая граница по первому ключу даёт планировщику диапазон по индексу
+    first = keys[0]
+    lead = f"{first.expr} {'<=' if first.desc else '>='} %s"
+    return f"{lead} AND ({' OR '.join(ors)})", (values[0], *params)
+
+
+def encode_cursor(order: list[tuple[str, bool]], row: dict[str, Any]) -> str:
+    payload = {"o": _signature(order), "v": [k.value(row) for k in _keys(order)]}
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(order: list[tuple[str, bool]], cursor: str) -> list[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw.decode("utf-8"))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise ValueError("некорректный курсор пагинации") from None
+    if not isinstance(payload, dict) or payload.get("o") != _signature(order):
+        raise ValueError("курсор относится к другой сортировке")
+    values = payload.get("v")
+    if not isinstance(values, list) or len(values) != len(_keys(order)):
+        raise ValueError("некорректный курсор пагинации")
+    return values
+
+
+# SELECT страницы после курсора; берём n + 1 строк, чтобы знать, есть ли продолжение
+def page_sql(
+    order: list[tuple[str, bool]],
+    cursor: str | None,
+    n: int,
+    where: str | None = None,
+    params: tuple = (),
+) -> tuple[str, tuple]:
+    conds: list[str] = [f"({where})"] if where else []
+    all_params = tuple(params)
+    if cursor:
+        seek, seek_params = seek_sql(order, decode_cursor(order, cursor))
+        conds.append(seek)
+        all_params += seek_params
+    where_sql = f"WHERE {' AND '.join(conds)}\n" if conds else ""
+    sql = (
+        "SELECT instructor_id, last_name, first_name, patronymic, phone, experience_years\n"
+        "FROM instructors\n"
+        f"{where_sql}{order_sql(order)}\nLIMIT %s"
+    )
+    return sql, all_params + (n + 1,)
+
+
+# строки страницы и курсор следующей (None - страница последняя)
+def split_page(
+    order: list[tuple[str, bool]], rows: list[dict[str, Any]], n: int
+) -> tuple[list[dict[str, Any]], str | None]:
+    if len(rows) <= n:
+        return rows, None
+    rows = rows[:n]
+    return rows, encode_cursor(order, rows[-1])
@@ -5,12 +5,15 @@ import json
 import yaml  # type: ignore[import-untyped]
 
 from adapters import DbRepoAdapter, JsonRepoAdapter, YamlRepoAdapter
+from db_singleton import PostgresDB
 from file_repo_decorator import FileFilterSortDecorator
 from file_spec import FileQuerySpec
+from filter_spec import Condition, FilterSpec, SortTerm
 from Instructor import Instructor
 from Instructor_rep_json import InstructorRepJson
 from Instructor_rep_yaml import InstructorRepYaml
 from instructor_repo_iface import InstructorRepo
+from migrations import migrate
 from PublicInstructorProfile import PublicInstructorProfile
 from repo_decorators import DbFilterSortDecorator
 from spec import QuerySpec
@@ -155,6 +158,21 @@ def smoke_files_with_decorator() -> None:
     )
     pp("пагинация (А/Б, FIO ASC):", fy.get_k_n_short_list(1, 10, f_AB_fio_asc))
 
+    # декларативный spec: тот же объект работает и с файлами, и с БД
+    d_exp_5_10 = FilterSpec(
+        conditions=(Condition("experience_years", "range", (5, 10)),),
+        order=(SortTerm("experience_years", desc=True), SortTerm("last_name")),
+    )
+    print("количество (стаж 5..10):", fy.get_count(d_exp_5_10))
+    pp(
+        "пагинация (стаж 5..10, стаж DESC, затем фамилия):",
+        fy.get_k_n_short_list(1, 10, d_exp_5_10),
+    )
+    print("тот же spec в SQL:", d_exp_5_10.to_query_spec())
+
+    # нечёткий поиск: опечатка в фамилии
+    pp("поиск 'Иваноф':", fy.search("Иваноф", 5))
+
 
 def demo_invalid_data_loading() -> None:
     print("=== INVALID DATA DEMO: JSON/YAML ===")
@@ -297,6 +315,10 @@ def demo_invalid_data_loading() -> None:
 if __name__ == "__main__":
     smoke(JsonRepoAdapter("instructors.json"), "JSON (adapter)")
     smoke(YamlRepoAdapter("instructors.yaml"), "YAML (adapter)")
+    # таблица и индексы БД - до первых запросов
+    migrate(
+        PostgresDB(host="localhost", port=5432, dbname="postgres", user="postgres", password="1234")
+    )
     smoke(
         DbRepoAdapter(
             host="localhost", port=5432, dbname="postgres", user="postgres", password="1234"
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import time
+
+from db_singleton import PostgresDB
+
+# правило равенства ФИО+стаж; на него опираются InstructorRepDB.add/replace_by_id:
+# FIO_EXP_COLUMNS - цель ON CONFLICT, FIO_EXP_INDEX - имя в UniqueViolation.constraint
+FIO_EXP_INDEX = "instructors_fio_exp_uniq"
+FIO_EXP_COLUMNS = "last_name, first_name, (COALESCE(patronymic, '')), experience_years"
+FIO_EXP_INDEX_SQL = f"""
+    CREATE UNIQUE INDEX IF NOT EXISTS {FIO_EXP_INDEX}
+        ON instructors ({FIO_EXP_COLUMNS})
+"""
+
+# фамилия со свёрнутой ё/Ё - по этому выражению идёт нечёткий поиск (InstructorRepDB.search);
+# регистр pg_trgm не различает сам
+FOLD_LAST_NAME_SQL = "replace(replace(last_name, 'ё', 'е'), 'Ё', 'Е')"
+
+# ключ advisory-блокировки: миграции из разных процессов идут по очереди
+_LOCK_KEY = 0x696E7374
+# пауза между попытками взять блокировку, с
+_LOCK_POLL = 0.2
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    statements: tuple[str, ...]
+    # миграция с расширением, которого нет на сервере, пропускается и остаётся в ожидании
+    requires_extension: str | None = None
+    # только индексы CONCURRENTLY: вне транзакции, запись в таблицу во время построения не блокируется
+    concurrent: bool = False
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(
+        1,
+        "таблица instructors",
+        (
+            """
+            CREATE TABLE IF NOT EXISTS instructors (
+                instructor_id    INTEGER PRIMARY KEY,
+                last_name        TEXT    NOT NULL,
+                first_name       TEXT    NOT NULL,
+                patronymic       TEXT,
+                phone            TEXT    NOT NULL,
+                experience_years INTEGER NOT NULL
+            )
+            """,
+        ),
+    ),
+    Migration(
+        2,
+        "индексы под сортировку списка и keyset-пагинацию",
+        (
+            # ORDER BY last_name, first_name, patronymic NULLS LAST, instructor_id
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS instructors_fio_sort_idx
+                ON instructors (last_name, first_name, patronymic, instructor_id)
+            """,
+            # ключ keyset.py: (patronymic IS NULL, COALESCE(patronymic, ''))
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS instructors_fio_keyset_idx
+                ON instructors (
+                    last_name, first_name, (patronymic IS NULL), (COALESCE(patronymic, '')),
+                    instructor_id
+                )
+            """,
+        ),
+        concurrent=True,
+    ),
+    Migration(3, "уникальность ФИО+стаж", (FIO_EXP_INDEX_SQL,)),
+    Migration(
+        4,
+        "префиксный поиск по фамилии (LIKE 'Ив%')",
+        (
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS instructors_last_name_prefix_idx
+                ON instructors (last_name text_pattern_ops)
+            """,
+        ),
+        concurrent=True,
+    ),
+    Migration(
+        5,
+        "триграммный индекс для ILIKE по фамилии",
+        (
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS instructors_last_name_trgm_idx
+                ON instructors USING gin (last_name gin_trgm_ops)
+            """,
+        ),
+        requires_extension="pg_trgm",
+        concurrent=True,
+    ),
+    Migration(
+        6,
+        "триграммный индекс для нечёткого поиска по фамилии (ё = е)",
+        (
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+            f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS instructors_last_name_fold_trgm_idx
+                ON instructors USING gin (({FOLD_LAST_NAME_SQL}) gin_trgm_ops)
+            """,
+        ),
+        requires_extension="pg_trgm",
+        concurrent=True,
+    ),
+)
+
+_VERSIONS_DDL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version     INTEGER PRIMARY KEY,
+        description TEXT        NOT NULL,
+        applied_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+"""
+
+
+def applied_versions(db: PostgresDB) -> set[int]:
+    row = db.fetchone("SELECT to_regclass('schema_migrations') IS NOT NULL AS present")
+    if not row or not row["present"]:
+        return set()
+    return {int(r["version"]) for r in db.fetchall("SELECT version FROM schema_migrations")}
+
+
+def pending(db: PostgresDB) -> list[Migration]:
+    done = applied_versions(db)
+    return [m for m in MIGRATIONS if m.version not in done]
+
+
+_RECORD_SQL = "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)"
+
+# невалидные индексы таблицы - остаток прерванного CREATE INDEX CONCURRENTLY
+_INVALID_INDEXES_SQL = """
+    SELECT c.relname AS name
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    WHERE i.indrelid = 'instructors'::regclass AND NOT i.indisvalid
+"""
+
+
+def _extension_missing(db: PostgresDB, m: Migration) -> bool:
+    return bool(m.requires_extension) and not db.fetchone(
+        "SELECT 1 FROM pg_available_extensions WHERE name = %s", (m.requires_extension,)
+    )
+
+
+# блокировка сессии берётся опросом, а не ожиданием: CREATE INDEX CONCURRENTLY ждёт конца
+# чужих транзакций, и процесс, повисший в pg_advisory_lock, дал бы взаимоблокировку
+def _lock(db: PostgresDB) -> None:
+    while True:
+        row = db.fetchone("SELECT pg_try_advisory_lock(%s) AS ok", (_LOCK_KEY,))
+        if row and row["ok"]:
+            return
+        time.sleep(_LOCK_POLL)
+
+
+def _apply(db: PostgresDB, m: Migration) -> None:
+    if m.concurrent:
+        # CONCURRENTLY нельзя выполнять в транзакции: каждый запрос - сам по себе.
+        # IF NOT EXISTS принял бы и недостроенный прерванной миграцией индекс - удаляем такие
+        for r in db.fetchall(_INVALID_INDEXES_SQL):
+            db.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{r["name"]}"')
+        for sql in m.statements:
+            db.execute(sql)
+        db.execute(_RECORD_SQL, (m.version, m.description))
+        return
+    with db.transaction():
+        for sql in m.statements:
+            db.execute(sql)
+        db.execute(_RECORD_SQL, (m.version, m.description))
+
+
+# применить недостающие миграции (до target включительно); каждая - своей транзакцией,
+# индексные (concurrent) - без транзакции, не блокируя запись в таблицу.
+# Миграции из разных процессов идут по очереди под advisory-блокировкой сессии
+def migrate(db: PostgresDB, target: int | None = None) -> list[int]:
+    applied: list[int] = []
+    with db.session():
+        _lock(db)
+        try:
+            db.execute(_VERSIONS_DDL)
+            # под блокировкой: миграции, применённые другим процессом, уже записаны
+            done = applied_versions(db)
+            for m in MIGRATIONS:
+                if target is not None and m.version > target:
+                    break
+                if m.version in done or _extension_missing(db, m):
+                    continue
+                _apply(db, m)
+                applied.append(m.version)
+        finally:
+            db.fetchone("SELECT pg_advisory_unlock(%s) AS ok", (_LOCK_KEY,))
+    return applied
@@ -1,11 +1,20 @@
 from __future__ import annotations
 
-from typing import Any, cast
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+import threading
+import time
+from typing import Any, TypeVar, cast
 
+from filter_spec import FilterSpec, as_query_spec
 from Instructor import Instructor
+from instructor_repo_iface import BatchResult, BulkLoadReport
+import keyset
 from PublicInstructorProfile import PublicInstructorProfile
 from spec import QuerySpec
 
+T = TypeVar("T")
+
 
 class DbFilterSortDecorator:
     # белый список разрешённых полей сортировки
@@ -17,6 +26,9 @@ class DbFilterSortDecorator:
         "experience_years": "experience_years",
         "phone": "phone",
     }
+    # поля с NULL: место NULL задаём явно (по возрастанию - в конце, по убыванию - в начале),
+    # иначе SQLite ставит их иначе, чем PostgreSQL, а keyset.py - иначе, чем OFFSET
+    _NULLABLE_ORDER_FIELDS = {"patronymic"}
     _ORDER_DEFAULT = "ORDER BY last_name, first_name, patronymic NULLS LAST, instructor_id"
 
     def __init__(self, db_repo: Any) -> None:
@@ -36,13 +48,82 @@ class DbFilterSortDecorator:
     def delete_by_id(self, instructor_id: int) -> bool:
         return cast(bool, self._repo.delete_by_id(instructor_id))
 
+    def add_many(self, items: list[Instructor]) -> BatchResult:
+        return cast(BatchResult, self._repo.add_many(items))
+
+    def replace_many(self, items: list[tuple[int, Instructor]]) -> BatchResult:
+        return cast(BatchResult, self._repo.replace_many(items))
+
+    def delete_many(self, instructor_ids: list[int]) -> BatchResult:
+        return cast(BatchResult, self._repo.delete_many(instructor_ids))
+
+    def bulk_load(self, items: Iterable[Instructor | dict[str, Any]]) -> BulkLoadReport:
+        return cast(BulkLoadReport, self._repo.bulk_load(items))
+
     def get_k_n_short_list(
-        self, k: int, n: int, spec: QuerySpec | None = None
+        self, k: int, n: int, spec: QuerySpec | FilterSpec | None = None
     ) -> list[PublicInstructorProfile]:
         if k <= 0 or n <= 0:
             return []
-        spec = spec or QuerySpec()
-        offset = (k - 1) * n
+        sql, params = self._page_sql(k, n, spec)
+        rows = self._db.fetchall(sql, params)
+        return [PublicInstructorProfile.from_validated_row(r) for r in rows]
+
+    def get_count(self, spec: QuerySpec | FilterSpec | None = None) -> int:
+        sql, params = self._count_sql(spec)
+        row = self._db.fetchone(sql, params)
+        return int(row["c"]) if row else 0
+
+    # страница и общее число строк под spec за один запрос вместо get_count + get_k_n_short_list;
+    # exact=False - оценка планировщика вместо точного COUNT (дёшево на больших выборках)
+    def get_page(
+        self, k: int, n: int, spec: QuerySpec | FilterSpec | None = None, exact: bool = True
+    ) -> tuple[list[PublicInstructorProfile], int]:
+        if k <= 0 or n <= 0:
+            return [], self.get_count(spec) if exact else 0
+        if not exact:
+            page = self.get_k_n_short_list(k, n, spec)
+            sql, params = self._estimate_sql(spec)
+            return page, self._fix_estimate(self._db.estimate_rows(sql, params), k, n, len(page))
+        sql, params = self._page_total_sql(k, n, spec)
+        rows = self._db.fetchall(sql, params)
+        if rows:
+            total = int(rows[0]["total_count"])
+        else:
+            # за последней страницей окно пустое - считаем отдельно
+            total = self.get_count(spec) if k > 1 else 0
+        return [PublicInstructorProfile.from_validated_row(r) for r in rows], total
+
+    # нечёткий поиск по фамилии - у репозитория (pg_trgm или его замена)
+    def search(self, text: str, limit: int = 20) -> list[PublicInstructorProfile]:
+        return cast(list[PublicInstructorProfile], self._repo.search(text, limit))
+
+    # keyset-пагинация: страница после курсора и курсор следующей (None - дальше пусто);
+    # курсор привязан к spec.order_by, стоимость не зависит от номера страницы
+    def get_keyset_page(
+        self, n: int, cursor: str | None = None, spec: QuerySpec | FilterSpec | None = None
+    ) -> tuple[list[PublicInstructorProfile], str | None]:
+        if n <= 0:
+            return [], None
+        order, sql, params = self._keyset_sql(n, cursor, spec)
+        rows, next_cursor = keyset.split_page(order, self._db.fetchall(sql, params), n)
+        return [PublicInstructorProfile.from_validated_row(r) for r in rows], next_cursor
+
+    def iter_all(self, batch_size: int = 1000, reverse: bool = False) -> Iterator[Instructor]:
+        return cast(Iterator[Instructor], self._repo.iter_all(batch_size, reverse))
+
+    # потоковый обход всех строк под spec (фильтр + сортировка) серверным курсором
+    def iter_spec(
+        self, spec: QuerySpec | FilterSpec | None = None, batch_size: int = 1000
+    ) -> Iterator[Instructor]:
+        sql, params = self._select_sql(spec)
+        for r in self._db.iter_rows(sql, params, batch_size):
+            yield Instructor.from_validated_row(r)
+
+    # SQL выборки, страницы и количества - общий для синхронного и асинхронного декораторов
+    @classmethod
+    def _select_sql(cls, spec: QuerySpec | FilterSpec | None) -> tuple[str, tuple]:
+        spec = as_query_spec(spec)
 
         base = """
         SELECT instructor_id, last_name, first_name, patronymic, phone, experience_years
@@ -50,25 +131,71 @@ class DbFilterSortDecorator:
         """
         # к скл запросу добавляем фильтры и сортировки
         where_sql = f"WHERE {spec.where}\n" if spec.where else ""
-        order_sql = self._build_order_sql(spec.order_by)
+        order_sql = cls._build_order_sql(spec.order_by)
+        return f"{base}{where_sql}{order_sql}", tuple(spec.params)
 
-        sql = f"{base}{where_sql}{order_sql}\nLIMIT %s OFFSET %s"
-        params = tuple(spec.params) + (n, offset)
-        rows = self._db.fetchall(sql, params)
-        return [PublicInstructorProfile(r) for r in rows]
+    @classmethod
+    def _page_sql(cls, k: int, n: int, spec: QuerySpec | FilterSpec | None) -> tuple[str, tuple]:
+        sql, params = cls._select_sql(spec)
+        offset = (k - 1) * n
+        return f"{sql}\nLIMIT %s OFFSET %s", params + (n, offset)
+
+    @classmethod
+    def _keyset_sql(
+        cls, n: int, cursor: str | None, spec: QuerySpec | FilterSpec | None
+    ) -> tuple[list[tuple[str, bool]], str, tuple]:
+        spec = as_query_spec(spec)
+        order = keyset.parse_order(spec.order_by, cls._ALLOWED_ORDER_FIELDS)
+        sql, params = keyset.page_sql(order, cursor, n, spec.where, tuple(spec.params))
+        return order, sql, params
+
+    # страница + общее число строк под фильтром окном COUNT(*) OVER () - один проход по WHERE
+    @classmethod
+    def _page_total_sql(
+        cls, k: int, n: int, spec: QuerySpec | FilterSpec | None
+    ) -> tuple[str, tuple]:
+        spec = as_query_spec(spec)
+        where_sql = f"WHERE {spec.where}\n" if spec.where else ""
+        sql = f"""
+        SELECT instructor_id, last_name, first_name, patronymic, phone, experience_years,
+               COUNT(*) OVER () AS total_count
+        FROM instructors
+        {where_sql}{cls._build_order_sql(spec.order_by)}
+        LIMIT %s OFFSET %s"""
+        return sql, tuple(spec.params) + (n, (k - 1) * n)
+
+    @classmethod
+    def _estimate_sql(cls, spec: QuerySpec | FilterSpec | None) -> tuple[str, tuple]:
+        spec = as_query_spec(spec)
+        sql = "SELECT 1 FROM instructors"
+        if spec.where:
+            sql += f" WHERE {spec.where}"
+        return sql, tuple(spec.params)
 
-    def get_count(self, spec: QuerySpec | None = None) -> int:
-        spec = spec or QuerySpec()
+    # итог не меньше уже увиденных строк; неполная страница (в том числе пустая первая) даёт
+    # точное число, а пустая страница k > 1 - верхнюю границу: строк не больше, чем до неё
+    @staticmethod
+    def _fix_estimate(estimate: int, k: int, n: int, rows: int) -> int:
+        seen = (k - 1) * n + rows
+        if rows == 0 and k > 1:
+            return min(estimate, seen)
+        if rows < n:
+            return seen
+        return max(estimate, seen)
+
+    @classmethod
+    def _count_sql(cls, spec: QuerySpec | FilterSpec | None) -> tuple[str, tuple]:
+        spec = as_query_spec(spec)
         sql = "SELECT COUNT(*) AS c FROM instructors "
         if spec.where:
             sql += f"WHERE {spec.where}"
-        row = self._db.fetchone(sql, tuple(spec.params))
-        return int(row["c"]) if row else 0
+        return sql, tuple(spec.params)
 
     # сборка ORDER BY по белому списку
-    def _build_order_sql(self, order_by: str | None) -> str:
+    @classmethod
+    def _build_order_sql(cls, order_by: str | None) -> str:
         if not order_by or not order_by.strip():
-            return self._ORDER_DEFAULT
+            return cls._ORDER_DEFAULT
 
         parts = []
         for chunk in order_by.split(","):
@@ -77,18 +204,274 @@ class DbFilterSortDecorator:
                 continue
             pieces = token.split()
             field = pieces[0]
-            if field not in self._ALLOWED_ORDER_FIELDS:
-                return self._ORDER_DEFAULT
-            sql_field = self._ALLOWED_ORDER_FIELDS[field]
+            if field not in cls._ALLOWED_ORDER_FIELDS:
+                return cls._ORDER_DEFAULT
+            sql_field = cls._ALLOWED_ORDER_FIELDS[field]
 
             direction = ""
             if len(pieces) >= 2:
                 dir_up = pieces[1].upper()
                 if dir_up not in ("ASC", "DESC"):
-                    return self._ORDER_DEFAULT
+                    return cls._ORDER_DEFAULT
                 direction = f" {dir_up}"
+            if sql_field in cls._NULLABLE_ORDER_FIELDS:
+                direction += " NULLS FIRST" if direction == " DESC" else " NULLS LAST"
             parts.append(f"{sql_field}{direction}")
 
         if not parts:
-            return self._ORDER_DEFAULT
+            return cls._ORDER_DEFAULT
         return "ORDER BY " + ", ".join(parts)
+
+
+_SNAPSHOT_FIELDS = (
+    "instructor_id",
+    "last_name",
+    "first_name",
+    "patronymic",
+    "phone",
+    "experience_years",
+)
+
+
+# в кэше держим неизменяемые снимки (класс + значения полей), а на каждое попадание собираем
+# новый объект: правка полученного объекта не меняет то, что увидит следующий вызывающий
+def _snapshot(item: Instructor) -> tuple:
+    values = tuple(getattr(item, f) for f in _SNAPSHOT_FIELDS)
+    override = None
+    if isinstance(item, PublicInstructorProfile) and item.contact != item.phone:
+        override = item.contact
+    return (type(item), values, override)
+
+
+def _restore(snap: tuple) -> Any:
+    cls, values, override = snap
+    row = dict(zip(_SNAPSHOT_FIELDS, values, strict=True))
+    row["contact_override"] = override
+    return cls.from_validated_row(row)
+
+
+# кэш результатов поверх DbFilterSortDecorator: частые страницы/количества не ходят в БД.
+# LRU на max_entries записей, каждая живёт не дольше ttl секунд; любая запись через этот
+# декоратор сбрасывает весь кэш (изменения в обход него видны только по истечении ttl)
+class CachingDbDecorator:
+    def __init__(self, inner: Any, max_entries: int = 1024, ttl: float = 30.0) -> None:
+        self._inner: Any = inner
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._cache: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        # номер "поколения": результат, прочитанный во время записи, в кэш не кладём
+        self._generation = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "invalidations": 0}
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {**self._stats, "size": len(self._cache)}
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._generation += 1
+            self._stats["invalidations"] += 1
+
+    @staticmethod
+    def _spec_key(spec: QuerySpec | FilterSpec | None) -> tuple:
+        spec = as_query_spec(spec)
+        return (spec.where, tuple(spec.params), spec.order_by)
+
+    def _cached(self, key: tuple, load: Callable[[], T]) -> T:
+        try:
+            hash(key)
+        except TypeError:
+            # параметры без хэша (например, списки) - мимо кэша
+            return load()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._cache.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return cast(T, entry[1])
+                del self._cache[key]
+                self._stats["expired"] += 1
+            self._stats["misses"] += 1
+            generation = self._generation
+        value = load()
+        with self._lock:
+            if generation == self._generation:
+                self._cache[key] = (time.monotonic() + self.ttl, value)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+                    self._stats["evictions"] += 1
+        return value
+
+    # чтение - через кэш (снимки, см. _snapshot)
+    def get_by_id(self, instructor_id: int) -> Instructor | None:
+        def load() -> tuple | None:
+            item = self._inner.get_by_id(instructor_id)
+            return None if item is None else _snapshot(item)
+
+        snap = self._cached(("id", instructor_id), load)
+        return None if snap is None else cast(Instructor, _restore(snap))
+
+    def get_k_n_short_list(
+        self, k: int, n: int, spec: QuerySpec | FilterSpec | None = None
+    ) -> list[PublicInstructorProfile]:
+        key = ("page", *self._spec_key(spec), k, n)
+        snaps = self._cached(
+            key, lambda: tuple(map(_snapshot, self._inner.get_k_n_short_list(k, n, spec)))
+        )
+        return [_restore(s) for s in snaps]
+
+    def get_count(self, spec: QuerySpec | FilterSpec | None = None) -> int:
+        key = ("count", *self._spec_key(spec))
+        return cast(int, self._cached(key, lambda: self._inner.get_count(spec)))
+
+    def get_page(
+        self, k: int, n: int, spec: QuerySpec | FilterSpec | None = None, exact: bool = True
+    ) -> tuple[list[PublicInstructorProfile], int]:
+        def load() -> tuple[tuple, int]:
+            page, total = self._inner.get_page(k, n, spec, exact)
+            return tuple(map(_snapshot, page)), total
+
+        snaps, total = self._cached(("page_total", *self._spec_key(spec), k, n, exact), load)
+        return [_restore(s) for s in snaps], total
+
+    def search(self, text: str, limit: int = 20) -> list[PublicInstructorProfile]:
+        snaps = self._cached(
+            ("search", text, limit), lambda: tuple(map(_snapshot, self._inner.search(text, limit)))
+        )
+        return [_restore(s) for s in snaps]
+
+    # курсорные и потоковые чтения не кэшируем
+    def get_keyset_page(
+        self, n: int, cursor: str | None = None, spec: QuerySpec | FilterSpec | None = None
+    ) -> tuple[list[PublicInstructorProfile], str | None]:
+        return cast(
+            tuple[list[PublicInstructorProfile], str | None],
+            self._inner.get_keyset_page(n, cursor, spec),
+        )
+
+    def iter_all(self, batch_size: int = 1000, reverse: bool = False) -> Iterator[Instructor]:
+        return cast(Iterator[Instructor], self._inner.iter_all(batch_size, reverse))
+
+    def iter_spec(
+        self, spec: QuerySpec | FilterSpec | None = None, batch_size: int = 1000
+    ) -> Iterator[Instructor]:
+        return cast(Iterator[Instructor], self._inner.iter_spec(spec, batch_size))
+
+    # запись - в базу, затем сброс кэша (и при ошибке: часть пакета могла успеть записаться)
+    def _write(self, call: Callable[[], T]) -> T:
+        try:
+            return call()
+        finally:
+            self.invalidate()
+
+    def add(self, item: Instructor) -> Instructor | None:
+        return cast(Instructor | None, self._write(lambda: self._inner.add(item)))
+
+    def replace_by_id(self, instructor_id: int, new_item: Instructor) -> bool:
+        return cast(bool, self._write(lambda: self._inner.replace_by_id(instructor_id, new_item)))
+
+    def delete_by_id(self, instructor_id: int) -> bool:
+        return cast(bool, self._write(lambda: self._inner.delete_by_id(instructor_id)))
+
+    def add_many(self, items: list[Instructor]) -> BatchResult:
+        return cast(BatchResult, self._write(lambda: self._inner.add_many(items)))
+
+    def replace_many(self, items: list[tuple[int, Instructor]]) -> BatchResult:
+        return cast(BatchResult, self._write(lambda: self._inner.replace_many(items)))
+
+    def delete_many(self, instructor_ids: list[int]) -> BatchResult:
+        return cast(BatchResult, self._write(lambda: self._inner.delete_many(instructor_ids)))
+
+    def bulk_load(self, items: Iterable[Instructor | dict[str, Any]]) -> BulkLoadReport:
+        return cast(BulkLoadReport, self._write(lambda: self._inner.bulk_load(items)))
+
+
+# асинхронный вариант: тот же SQL (DbFilterSortDecorator._select_sql/_page_sql/_count_sql) поверх
+# AsyncInstructorRepDB / AsyncDbRepoAdapter (adapters_async)
+class AsyncDbFilterSortDecorator:
+    def __init__(self, db_repo: Any) -> None:
+        self._repo: Any = db_repo
+        self._db: Any = db_repo._adaptee.db if hasattr(db_repo, "_adaptee") else db_repo.db
+
+    async def get_by_id(self, instructor_id: int) -> Instructor | None:
+        return cast(Instructor | None, await self._repo.get_by_id(instructor_id))
+
+    async def add(self, item: Instructor) -> Instructor | None:
+        return cast(Instructor | None, await self._repo.add(item))
+
+    async def replace_by_id(self, instructor_id: int, new_item: Instructor) -> bool:
+        return cast(bool, await self._repo.replace_by_id(instructor_id, new_item))
+
+    async def delete_by_id(self, instructor_id: int) -> bool:
+        return cast(bool, await self._repo.delete_by_id(instructor_id))
+
+    async def add_many(self, items: list[Instructor]) -> BatchResult:
+        return cast(BatchResult, await self._repo.add_many(items))
+
+    async def replace_many(self, items: list[tuple[int, Instructor]]) -> BatchResult:
+        return cast(BatchResult, await self._repo.replace_many(items))
+
+    async def delete_many(self, instructor_ids: list[int]) -> BatchResult:
+        return cast(BatchResult, await self._repo.delete_many(instructor_ids))
+
+    async def sort_by_last_name(self, reverse: bool = False) -> list[Instructor]:
+        return cast(list[Instructor], await self._repo.sort_by_last_name(reverse=reverse))
+
+    async def get_k_n_short_list(
+        self, k: int, n: int, spec: QuerySpec | FilterSpec | None = None
+    ) -> list[PublicInstructorProfile]:
+        if k <= 0 or n <= 0:
+            return []
+        sql, params = DbFilterSortDecorator._page_sql(k, n, spec)
+        rows = await self._db.fetchall(sql, params)
+        return [PublicInstructorProfile.from_validated_row(r) for r in rows]
+
+    async def get_count(self, spec: QuerySpec | FilterSpec | None = None) -> int:
+        sql, params = DbFilterSortDecorator._count_sql(spec)
+        row = await self._db.fetchone(sql, params)
+        return int(row["c"]) if row else 0
+
+    async def get_page(
+        self, k: int, n: int, spec: QuerySpec | FilterSpec | None = None, exact: bool = True
+    ) -> tuple[list[PublicInstructorProfile], int]:
+        if k <= 0 or n <= 0:
+            return [], await self.get_count(spec) if exact else 0
+        if not exact:
+            page = await self.get_k_n_short_list(k, n, spec)
+            sql, params = DbFilterSortDecorator._estimate_sql(spec)
+            estimate = await self._db.estimate_rows(sql, params)
+            return page, DbFilterSortDecorator._fix_estimate(estimate, k, n, len(page))
+        sql, params = DbFilterSortDecorator._page_total_sql(k, n, spec)
+        rows = await self._db.fetchall(sql, params)
+        if rows:
+            total = int(rows[0]["total_count"])
+        else:
+            total = await self.get_count(spec) if k > 1 else 0
+        return [PublicInstructorProfile.from_validated_row(r) for r in rows], total
+
+    async def search(self, text: str, limit: int = 20) -> list[PublicInstructorProfile]:
+        return cast(list[PublicInstructorProfile], await self._repo.search(text, limit))
+
+    async def get_keyset_page(
+        self, n: int, cursor: str | None = None, spec: QuerySpec | FilterSpec | None = None
+    ) -> tuple[list[PublicInstructorProfile], str | None]:
+        if n <= 0:
+            return [], None
+        order, sql, params = DbFilterSortDecorator._keyset_sql(n, cursor, spec)
+        rows, next_cursor = keyset.split_page(order, await self._db.fetchall(sql, params), n)
+        return [PublicInstructorProfile.from_validated_row(r) for r in rows], next_cursor
+
+    def iter_all(self, batch_size: int = 1000, reverse: bool = False) -> AsyncIterator[Instructor]:
+        return cast(AsyncIterator[Instructor], self._repo.iter_all(batch_size, reverse))
+
+    async def iter_spec(
+        self, spec: QuerySpec | FilterSpec | None = None, batch_size: int = 1000
+    ) -> AsyncIterator[Instructor]:
+        sql, params = DbFilterSortDecorator._select_sql(spec)
+        async for r in self._db.iter_rows(sql, params, batch_size):
+            yield Instructor.from_validated_row(r)
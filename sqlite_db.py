@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from functools import lru_cache
+import os
+import re
+import sqlite3
+import threading
+from typing import Any
+
+from db_singleton import UniqueViolation
+
+# плейсхолдеры psycopg2 (%s, %%) -> sqlite (?, %)
+_PARAM_RE = re.compile(r"%%|%s")
+# "UNIQUE constraint failed: index 'name'" / "...: table.col" (первичный ключ)
+_UNIQUE_INDEX_RE = re.compile(r"UNIQUE constraint failed: index '([^']+)'")
+_UNIQUE_COLUMN_RE = re.compile(r"UNIQUE constraint failed: (\w+)\.")
+# ILIKE в SQLite нет: "col ILIKE %s" переписываем в вызов функции ilike(col, %s)
+_ILIKE_RE = re.compile(r"(\w+(?:\.\w+)?)\s+ILIKE\s+%s", re.IGNORECASE)
+
+
+@lru_cache(maxsize=256)
+def _like_regex(pattern: str) -> re.Pattern[str]:
+    parts = []
+    for ch in pattern.casefold():
+        if ch == "%":
+            parts.append(".*")
+        elif ch == "_":
+            parts.append(".")
+        else:
+            parts.append(re.escape(ch))
+    return re.compile("".join(parts), re.DOTALL)
+
+
+def _ilike(value: str | None, pattern: str | None) -> int | None:
+    if value is None or pattern is None:
+        return None
+    return 1 if _like_regex(pattern).fullmatch(value.casefold()) else 0
+
+
+# тот же интерфейс, что у PostgresDB (execute/fetchone/fetchall с плейсхолдерами %s),
+# поэтому InstructorRepDB и DbFilterSortDecorator работают с ним без изменений
+class SqliteDB:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn: Any = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # LIKE чувствителен к регистру, как в PostgreSQL
+        self._conn.execute("PRAGMA case_sensitive_like=ON")
+        self._conn.create_function("ilike", 2, _ilike, deterministic=True)
+
+    @staticmethod
+    def _translate(sql: str) -> str:
+        sql = _ILIKE_RE.sub(r"ilike(\1, %s)", sql)
+        return _PARAM_RE.sub(lambda m: "%" if m.group(0) == "%%" else "?", sql)
+
+    # IntegrityError уникальности -> UniqueViolation с именем ограничения, как у PostgresDB
+    @staticmethod
+    def _unique_violation(e: sqlite3.IntegrityError) -> UniqueViolation | None:
+        msg = str(e)
+        m = _UNIQUE_INDEX_RE.search(msg)
+        if m:
+            return UniqueViolation(m.group(1), msg)
+        m = _UNIQUE_COLUMN_RE.search(msg)
+        if m:
+            return UniqueViolation(f"{m.group(1)}_pkey", msg)
+        return None
+
+    def _exec(self, cur: Any, sql: str, params: tuple[Any, ...] | None) -> None:
+        try:
+            cur.execute(self._translate(sql), params or ())
+        except sqlite3.IntegrityError as e:
+            err = self._unique_violation(e)
+            if err is None:
+                raise
+            raise err from e
+
+    @contextmanager
+    def cursor(self) -> Iterator[Any]:
+        with self._lock:
+            cur: Any = self._conn.cursor()
+            try:
+                yield cur
+            finally:
+                cur.close()
+
+    # несколько запросов одной транзакцией; при исключении - откат
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                yield
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def execute(self, sql: str, params: tuple[Any, ...] | None = None) -> int:
+        with self.cursor() as cur:
+            self._exec(cur, sql, params)
+            return int(cur.rowcount)
+
+    def executemany(self, sql: str, seq: Iterable[tuple[Any, ...]]) -> None:
+        with self.cursor() as cur:
+            cur.executemany(self._translate(sql), seq)
+
+    def executescript(self, sql: str) -> None:
+        with self._lock:
+            self._conn.executescript(sql)
+
+    def fetchone(self, sql: str, params: tuple[Any, ...] | None = None) -> dict[str, Any] | None:
+        with self.cursor() as cur:
+            self._exec(cur, sql, params)
+            row: Any = cur.fetchone()
+            return dict(row) if row else None
+
+    def fetchall(self, sql: str, params: tuple[Any, ...] | None = None) -> list[dict[str, Any]]:
+        with self.cursor() as cur:
+            self._exec(cur, sql, params)
+            rows: Any = cur.fetchall() or []
+            return [dict(r) for r in rows]
+
+    # у SQLite нет оценок строк в плане - считаем точно
+    def estimate_rows(self, sql: str, params: tuple[Any, ...] | None = None) -> int:
+        row = self.fetchone(f"SELECT COUNT(*) AS c FROM ({sql})", params)
+        return int(row["c"]) if row else 0
+
+    # потоковое чтение пачками fetchmany; блокировка берётся на каждую пачку, а не на весь обход
+    def iter_rows(
+        self, sql: str, params: tuple[Any, ...] | None = None, batch_size: int = 1000
+    ) -> Iterator[dict[str, Any]]:
+        with self._lock:
+            cur: Any = self._conn.cursor()
+            self._exec(cur, sql, params)
+        try:
+            while True:
+                with self._lock:
+                    rows: Any = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                for r in rows:
+                    yield dict(r)
+        finally:
+            cur.close()
+
+    def close(self) -> None:
+        if getattr(self, "_conn", None):
+            self._conn.close()
+            self._conn = None
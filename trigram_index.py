@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Iterable
+from itertools import chain
+import re
+
+# нечёткий поиск по фамилии: триграммы и сходство считаются как в pg_trgm. Порядок выдачи -
+# по убыванию сходства, затем по свёрнутой (fold) фамилии и id; так же сортирует и SQL-сторона
+
+# порог similarity() по умолчанию в pg_trgm (pg_trgm.similarity_threshold)
+SIMILARITY_THRESHOLD = 0.3
+
+# слова для pg_trgm - последовательности букв и цифр (без "_")
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+# регистр и ё/е не различаем
+def fold(text: str) -> str:
+    return text.casefold().replace("ё", "е")
+
+
+# каждое слово дополняется "  " слева и " " справа: "  ив", " ив", "ива", ..., "ов "
+def trigrams(text: str) -> frozenset[str]:
+    grams: set[str] = set()
+    for word in _WORD_RE.findall(fold(text)):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def similarity(a: frozenset[str], b: frozenset[str]) -> float:
+    if not a or not b:
+        return 0.0
+    common = len(a & b)
+    return common / (len(a) + len(b) - common)
+
+
+# фамилии по убыванию сходства с text, пока их записей (count) не наберётся на limit;
+# для хранилищ без индекса триграмм - сравниваются различные фамилии, а не все записи.
+# Написания, совпадающие после fold(), идут одной группой, как в TrigramIndex
+def best_names(text: str, counts: Iterable[tuple[str, int]], limit: int) -> list[str]:
+    query = trigrams(text)
+    totals: Counter[str] = Counter()
+    spellings: dict[str, list[str]] = {}
+    for name, count in counts:
+        t = fold(name)
+        totals[t] += count
+        spellings.setdefault(t, []).append(name)
+    ranked = []
+    for t, count in totals.items():
+        score = similarity(query, trigrams(t))
+        if score >= SIMILARITY_THRESHOLD:
+            ranked.append((-score, t, count))
+    ranked.sort()
+    names: list[str] = []
+    total = 0
+    for _, t, count in ranked:
+        if total >= limit:
+            break
+        names.extend(spellings[t])
+        total += count
+    return names
+
+
+# инвертированный индекс триграмм. Хранит различные (свёрнутые) фамилии, а не записи:
+# однофамильцев много, поэтому поиск считает сходство по тысячам строк, а не по миллиону записей
+class TrigramIndex:
+    def __init__(self) -> None:
+        self._ids: dict[str, set[int]] = {}
+        self._grams: dict[str, frozenset[str]] = {}
+        self._postings: dict[str, set[str]] = {}
+        self._text_of: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._text_of)
+
+    def add(self, key: int, text: str) -> None:
+        self.remove(key)
+        t = fold(text.strip())
+        self._text_of[key] = t
+        ids = self._ids.get(t)
+        if ids is not None:
+            ids.add(key)
+            return
+        self._ids[t] = {key}
+        grams = self._grams[t] = trigrams(t)
+        for g in grams:
+            self._postings.setdefault(g, set()).add(t)
+
+    def remove(self, key: int) -> None:
+        t = self._text_of.pop(key, None)
+        if t is None:
+            return
+        ids = self._ids[t]
+        ids.discard(key)
+        if ids:
+            return
+        del self._ids[t]
+        for g in self._grams.pop(t):
+            texts = self._postings[g]
+            texts.discard(t)
+            if not texts:
+                del self._postings[g]
+
+    # (key, сходство) лучших limit записей: по убыванию сходства, затем по фамилии и key
+    def search(
+        self, text: str, limit: int, threshold: float = SIMILARITY_THRESHOLD
+    ) -> list[tuple[int, float]]:
+        query = trigrams(text)
+        if not query or limit <= 0:
+            return []
+        hits = Counter(chain.from_iterable(self._postings.get(g, ()) for g in query))
+        scored: list[tuple[float, str]] = []
+        for t, common in hits.items():
+            score = common / (len(query) + len(self._grams[t]) - common)
+            if score >= threshold:
+                scored.append((score, t))
+        scored.sort(key=lambda st: (-st[0], st[1]))
+        out: list[tuple[int, float]] = []
+        for score, t in scored:
+            for key in sorted(self._ids[t]):
+                out.append((key, score))
+                if len(out) >= limit:
+                    return out
+        return out